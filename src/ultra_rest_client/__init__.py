@@ -1,4 +1,12 @@
 from .ultra_rest_client import RestApiClient
 from .connection import RestApiConnection
-from .utils.tasks import TaskHandler
-from .utils.reports import ReportHandler
\ No newline at end of file
+from .async_client import AsyncRestApiClient
+from .async_connection import AsyncRestApiConnection
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
+from .concurrency import AdaptiveConcurrency
+from .cache import ResponseCache
+from .utils.polling import PollingStrategy
+from .utils.tasks import TaskHandler, TaskTracker
+from .utils.reports import ReportHandler
+from .utils.scheduler import PollScheduler
\ No newline at end of file
@@ -0,0 +1,251 @@
+# Copyright 2023 Vercara. All rights reserved.
+# Vercara, the Vercara logo and related names and logos are registered
+# trademarks, service marks or tradenames of Vercara. All other
+# product names, company names, marks, logos and symbols may be trademarks
+# of their respective owners.
+__author__ = 'UltraDNS'
+from .async_connection import AsyncRestApiConnection
+from .ultra_rest_client import RestApiClient
+from .utils.batching import AsyncDeferredBatch, bulk_batch_async
+from .utils.exports import bulk_export_async, iter_zone_files
+from .utils.imports import import_rrsets_async
+from .utils.pagination import iter_offset_pages_async, next_cursor, page_items
+from .utils.polling import PollingStrategy
+from .utils.reconcile import reconcile_zone_async
+from .utils.zonefile import group_rrsets, iter_zone_records
+import asyncio
+import json
+import tempfile
+
+
+class AsyncRestApiClient(RestApiClient):
+    """asyncio variant of RestApiClient.
+
+    Every API method of RestApiClient is available and returns an awaitable. The
+    endpoint methods and payload builders are inherited from RestApiClient; only
+    the connection (and methods that poll) differ.
+
+    Example:
+        async with AsyncRestApiClient(username, password) as client:
+            zones = await asyncio.gather(*(client.get_zone_metadata(z) for z in names))
+    """
+
+    def __init__(self, bu: str, pr: str = None, use_token: bool = False, use_http: bool = False, host: str = "api.ultradns.com", custom_headers=None, proxy=None, verify_https=True, pool_maxsize=100, keepalive_timeout=15, token_refresh_margin=60, retry_policy=None, rate_limiter=None, concurrency=None, cache=None, coalesce_requests=False, polling=None):
+        """Initialize an async Rest API Client.
+
+        Arguments:
+        bu (str) -- Either username or bearer token based on `use_token` flag.
+        pr (str, optional) -- Either password or refresh token based on `use_token` flag. Defaults to None.
+        use_token (bool, optional) -- If True, treats `bu` as bearer token and `pr` as refresh token. Defaults to False.
+
+        Keyword Arguments:
+        use_http (bool, optional) -- For internal testing purposes only, lets developers use http instead of https.
+        host (str) -- Allows you to point to a server other than the production server.
+        pool_maxsize (int) -- Maximum number of concurrent connections to the API host. Defaults to 100.
+        keepalive_timeout (float) -- Seconds an idle pooled connection is kept open. Defaults to 15.
+        token_refresh_margin (float) -- Refresh the access token this many seconds before it expires, but never
+                                        earlier than half way through its lifetime. Defaults to 60.
+        retry_policy (RetryPolicy, optional) -- Controls how throttled (429), unavailable (502/503/504) and failed
+                                                connections are retried. Defaults to RetryPolicy().
+        rate_limiter (RateLimiter, optional) -- Paces requests to a known request budget. Defaults to None.
+        concurrency (AdaptiveConcurrency, optional) -- Self-tuning limit on requests in flight. Coroutines wait
+                                                       for a slot without blocking the event loop. Defaults to None.
+        cache (ResponseCache, optional) -- Caches GET responses; writes through this client invalidate the
+                                          entries they affect. Defaults to None (no caching).
+        coalesce_requests (bool) -- Share one request between identical GETs made concurrently. Defaults to False.
+        polling (PollingStrategy, optional) -- How export_zone polls its export task. Defaults to PollingStrategy().
+
+        Username/password authentication happens on the first request (or when
+        entering the client's async context), since it cannot be awaited here.
+
+        Raises:
+        ValueError -- If `pr` is not provided when `use_token` is False.
+        """
+        if not use_token and not pr:
+            raise ValueError("Password is required when providing a username.")
+        self.polling = polling or PollingStrategy()
+
+        self.rest_api_connection = AsyncRestApiConnection(
+            use_http,
+            host,
+            bu if use_token else "",
+            pr if use_token else "",
+            custom_headers=custom_headers,
+            proxy=proxy,
+            verify_https=verify_https,
+            pool_maxsize=pool_maxsize,
+            keepalive_timeout=keepalive_timeout,
+            token_refresh_margin=token_refresh_margin,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            concurrency=concurrency,
+            cache=cache,
+            coalesce_requests=coalesce_requests
+        )
+        if use_token:
+            self.access_token = bu
+            self.refresh_token = pr
+            if not self.refresh_token:
+                print(
+                    "Warning: Passing a Bearer token with no refresh token means the client state will expire after an hour.")
+        else:
+            self.rest_api_connection.set_credentials(bu, pr)
+
+    # Lifecycle
+    async def close(self):
+        """Closes the underlying connection and releases its pooled HTTP connections."""
+        await self.rest_api_connection.close()
+
+    async def __aenter__(self):
+        await self.rest_api_connection._ensure_auth()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("AsyncRestApiClient must be used with 'async with', not 'with'.")
+
+    async def iter_zones_v3(self, q=None, prefetch=True, **kwargs):
+        """Yields every zone across all of the user's accounts, following v3 cursors (async generator).
+
+        See RestApiClient.iter_zones_v3.
+        """
+        async def fetch_page(cursor):
+            params = dict(kwargs)
+            if cursor is not None:
+                params['cursor'] = cursor
+            return await self.get_zones_v3(q, **params)
+
+        upcoming = None
+        page = await fetch_page(None)
+        try:
+            while True:
+                zones = page_items(page, 'zones')
+                cursor = next_cursor(page) if zones else None
+                if cursor is not None and prefetch:
+                    upcoming = asyncio.ensure_future(fetch_page(cursor))
+
+                for zone in zones:
+                    yield zone
+
+                if cursor is None:
+                    return
+                page = await upcoming if upcoming is not None else await fetch_page(cursor)
+                upcoming = None
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+
+    # iter_zones, iter_zones_of_account, iter_rrsets and iter_rrsets_by_type are
+    # inherited; with this override they return async generators.
+    def _iter_offset(self, get_page, items_key, page_size, max_workers, ordered, kwargs):
+        def fetch_page(offset, limit):
+            return get_page(**dict(kwargs, offset=offset, limit=limit))
+        return iter_offset_pages_async(fetch_page, items_key, page_size, max_workers, ordered)
+
+    async def fetch_all_rrsets(self, zone_name, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Returns a list of every RRSet in the specified zone. See RestApiClient.iter_rrsets."""
+        return [rrset async for rrset in self.iter_rrsets(zone_name, q, page_size, max_workers, ordered, **kwargs)]
+
+    async def batch_bulk(self, batch_list, chunk_size=100, max_workers=4):
+        """Sends any number of requests as concurrent batches.
+
+        See RestApiClient.batch_bulk.
+        """
+        return await bulk_batch_async(self, batch_list, chunk_size, max_workers)
+
+    def deferred(self, chunk_size=100, max_workers=1):
+        """Returns an async context manager that turns this client's writes into batches.
+
+        Inside the `async with` block, awaited write methods return an asyncio Future
+        instead of sending the request. See RestApiClient.deferred.
+        """
+        return AsyncDeferredBatch(self, chunk_size, max_workers)
+
+    async def reconcile_zone(self, zone_name, desired_rrsets, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4, keep_pools=True):
+        """Makes a zone contain exactly the desired RRSets, with the fewest changes.
+
+        See RestApiClient.reconcile_zone.
+        """
+        return await reconcile_zone_async(self, zone_name, desired_rrsets, dry_run, manage_apex, chunk_size, max_workers, keep_pools)
+
+    async def sync_zone_from_file(self, zone_name, bind_file, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4):
+        """Updates a live zone to match a BIND zone file, sending only the differences.
+
+        The file is parsed in a worker thread, so the event loop isn't blocked while it
+        is read. See RestApiClient.sync_zone_from_file.
+        """
+        desired_rrsets = await asyncio.to_thread(lambda: group_rrsets(iter_zone_records(bind_file, origin=zone_name)))
+        return await self.reconcile_zone(zone_name, desired_rrsets, dry_run, manage_apex, chunk_size, max_workers)
+
+    async def import_rrsets(self, source, fmt=None, zone_name=None, window=10000, chunk_size=100, max_workers=4, progress=None):
+        """Creates RRSets from a CSV or JSON Lines file, using concurrent batches.
+
+        See RestApiClient.import_rrsets.
+        """
+        return await import_rrsets_async(self, source, fmt, zone_name, window, chunk_size, max_workers, progress)
+
+    # export zone in bind format
+    async def export_zone(self, zone_name):
+        """Returns a zone file in bind format
+
+        Arguments:
+        zone_name -- The name of the zone being returned. A single zone as a string.
+
+        """
+        task_id = await self._start_export([zone_name])
+        result = await self.rest_api_connection.get(f"/v1/tasks/{task_id}/result")
+        await self.clear_task(task_id)
+        return result
+
+    async def export_zones_to_file(self, zone_names, sink, chunk_size=64 * 1024):
+        """Exports one or more zones and streams the result to a file in chunks.
+
+        See RestApiClient.export_zones_to_file.
+        """
+        if isinstance(zone_names, str):
+            zone_names = [zone_names]
+        task_id = await self._start_export(zone_names)
+        written = await self.rest_api_connection.download(f"/v1/tasks/{task_id}/result", sink, chunk_size=chunk_size)
+        await self.clear_task(task_id)
+        return written
+
+    async def iter_exported_zones(self, zone_names, chunk_size=64 * 1024):
+        """Exports zones and yields their bind files one at a time (async generator).
+
+        See RestApiClient.iter_exported_zones.
+        """
+        if isinstance(zone_names, str):
+            zone_names = [zone_names]
+        with tempfile.TemporaryFile() as archive:
+            await self.export_zones_to_file(zone_names, archive, chunk_size)
+            archive.seek(0)
+            for zone_name, bind_text in iter_zone_files(archive):
+                yield zone_name or zone_names[0], bind_text
+
+
+    def export_zones(self, zone_names, chunk_size=100, max_workers=4, output_dir=None):
+        """Exports a large number of zones as concurrent multi-zone export tasks (async generator).
+
+        See RestApiClient.export_zones.
+        """
+        return bulk_export_async(self, zone_names, chunk_size=chunk_size, max_workers=max_workers, output_dir=output_dir)
+
+    async def _start_export(self, zone_names):
+        zonejson = json.dumps({'zoneNames': zone_names})
+        status = await self.rest_api_connection.post("/v3/zones/export", json=zonejson)
+        task_id = status.get('task_id')
+        await self._wait_for_task(task_id)
+        return task_id
+
+    async def _wait_for_task(self, task_id):
+        delays = self.polling.delays()
+        while True:
+            task_status = await self.rest_api_connection.get(f"/v1/tasks/{task_id}")
+            if task_status.get('code') not in ['PENDING', 'IN_PROCESS']:
+                return task_status
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(f"Task {task_id} did not finish before the polling deadline")
+            await asyncio.sleep(delay)
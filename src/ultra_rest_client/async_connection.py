@@ -0,0 +1,347 @@
+# Copyright 2023 Vercara. All rights reserved.
+# Vercara, the Vercara logo and related names and logos are registered
+# trademarks, service marks or tradenames of Vercara, Inc. All other
+# product names, company names, marks, logos and symbols may be trademarks
+# of their respective owners.
+__author__ = 'UltraDNS'
+
+# asyncio counterpart of RestApiConnection, backed by aiohttp
+import asyncio
+import contextvars
+import json
+import os
+from .connection import RestApiConnection, AuthError, RestError, _file_positions, _rewind_files
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncRestApiConnection(RestApiConnection):
+    """Non-blocking connection that mirrors RestApiConnection.
+
+    Every public HTTP method is a coroutine. Header construction, host
+    resolution and custom header handling are inherited from RestApiConnection.
+    """
+
+    def __init__(self, use_http=False, host="api.ultradns.com", access_token: str = "", refresh_token: str = "", custom_headers=None, proxy=None, verify_https=True, pool_maxsize=100, keepalive_timeout=15, token_refresh_margin=60, retry_policy=None, rate_limiter=None, concurrency=None, cache=None, coalesce_requests=False):
+        if aiohttp is None:
+            raise ImportError("AsyncRestApiConnection requires aiohttp. Install it with: pip install ultra-rest-client[async]")
+        super().__init__(
+            use_http,
+            host,
+            access_token,
+            refresh_token,
+            custom_headers=custom_headers,
+            proxy=proxy,
+            verify_https=verify_https,
+            pool_maxsize=pool_maxsize,
+            keepalive_timeout=keepalive_timeout,
+            token_refresh_margin=token_refresh_margin,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            concurrency=concurrency,
+            cache=cache,
+            coalesce_requests=coalesce_requests
+        )
+        self._credentials = None
+        self._token_lock = asyncio.Lock()
+        # the active AsyncDeferredBatch; a context variable, since tasks share a thread
+        self._deferred = contextvars.ContextVar('deferred_batch', default=None)
+
+    # Session Lifecycle
+    # The aiohttp session has to be created from inside a running event loop,
+    # so it is built lazily on the first request.
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """Close the shared session and release all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("AsyncRestApiConnection must be used with 'async with', not 'with'.")
+
+    def _request_kwargs(self, url):
+        kwargs = {}
+        if self.proxy:
+            proxy = self.proxy.get("https" if url.startswith("https://") else "http")
+            if proxy:
+                kwargs["proxy"] = proxy
+        if not self.verify_https:
+            kwargs["ssl"] = False
+        return kwargs
+
+    # Authentication
+
+    def set_credentials(self, username, password):
+        """Store credentials so the first request authenticates on demand."""
+        self._credentials = (username, password)
+
+    async def _ensure_auth(self):
+        if self._credentials is None:
+            return
+        async with self._token_lock:
+            # another task may have logged in while we waited
+            if self._credentials is not None:
+                username, password = self._credentials
+                await self.auth(username, password)
+
+    async def auth(self, username, password):
+        await self._token_request({
+            "grant_type": "password",
+            "username": username,
+            "password": password
+        })
+        self._credentials = None
+
+    async def _refresh(self):
+        await self._token_request({
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token
+        })
+
+    async def _refresh_token(self, stale_token):
+        """Refresh the token pair once on behalf of every task that saw stale_token expire."""
+        async with self._token_lock:
+            if self.access_token != stale_token:
+                return
+            if self._failed_refresh is not None and self._failed_refresh[0] == stale_token:
+                raise self._failed_refresh[1]
+            try:
+                await self._refresh()
+            except AuthError as e:
+                self._failed_refresh = (stale_token, e)
+                raise
+
+    async def _renew_if_expiring(self):
+        """Refresh ahead of expiry so requests don't fail with 60001 first."""
+        if self._token_expiring():
+            try:
+                await self._refresh_token(self.access_token)
+            except AuthError:
+                pass
+
+    async def _token_request(self, payload):
+        url = f"{self._get_connection()}/v1/authorization/token"
+        async with self._get_session().post(url, data=payload, **self._request_kwargs(url)) as response:
+            json_body = await response.json(content_type=None)
+            if response.status == 200:
+                self._store_tokens(json_body)
+            else:
+                raise AuthError(json_body)
+
+    # Main Request Method
+
+    def _build_data(self, body, files):
+        if files:
+            data = aiohttp.FormData()
+            for name, (filename, value, file_type) in files.items():
+                data.add_field(name, value, filename=filename or None, content_type=file_type)
+            return data
+        return json.dumps(body) if isinstance(body, (dict, list)) else body
+
+    async def _send(self, method, uri, params=None, body=None, files=None, content_type="application/json", stream=False, headers=None):
+        """Send a request, replaying it under the retry policy on throttling, 5xx or connection errors.
+
+        The body is read before returning, so the response can be inspected after
+        its connection has gone back to the pool. With stream=True the body is left
+        unread and the caller must release the response.
+        """
+        url = self._get_connection() + uri
+        query = None
+        if params:
+            # aiohttp only accepts str/int/float query values
+            query = {k: str(v) if isinstance(v, bool) else v for k, v in params.items()}
+        positions = _file_positions(files)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            _rewind_files(files, positions)
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve(method, uri)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            access_token = self.access_token
+            slot = await self.concurrency.acquire_async() if self.concurrency is not None else None
+            try:
+                response = await self._get_session().request(
+                    method,
+                    url,
+                    params=query,
+                    data=self._build_data(body, files),
+                    headers=self._build_headers(content_type, access_token, headers),
+                    **self._request_kwargs(url)
+                )
+                if not stream or self.retry_policy.retries_status(response.status):
+                    try:
+                        await response.read()
+                    finally:
+                        response.release()
+            except BaseException as e:
+                # includes cancellation, so the slot is never leaked
+                if slot is not None:
+                    self.concurrency.release(slot, error=True)
+                if not isinstance(e, aiohttp.ClientConnectionError):
+                    raise
+                delay = self.retry_policy.get_delay(attempt, started, error=e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if slot is not None:
+                self.concurrency.release(slot, response.status)
+
+            if self.retry_policy.retries_status(response.status):
+                delay = self.retry_policy.get_delay(attempt, started, retry_after=response.headers.get('Retry-After'))
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+
+            return response, access_token
+
+    async def _do_call(self, uri, method, params=None, body=None, retry=True, files=None, content_type="application/json"):
+        deferred = self._deferred.get()
+        if deferred is not None and deferred.accepts(method, uri, files):
+            return deferred.record(method, uri, body)
+        return (await self._call(uri, method, params, body, retry, files, content_type))[1]
+
+    async def _call(self, uri, method, params=None, body=None, retry=True, files=None, content_type="application/json", headers=None):
+        """Like _do_call, but returns the final response along with its parsed body."""
+        await self._ensure_auth()
+        await self._renew_if_expiring()
+        try:
+            response, access_token = await self._send(method, uri, params, body, files, content_type, headers=headers)
+        finally:
+            if self.cache is not None and method != "GET":
+                self.cache.invalidate(method, uri, body)
+        if response.status == 204:
+            return response, {}
+        if response.status == 304:
+            return response, None
+
+        # if the content-type is text/plain just return the text
+        if response.content_type == 'text/plain':
+            return response, await response.text()
+
+        # Return the bytes. Zone exports produce zip files when done in batch.
+        if response.content_type == 'application/zip':
+            return response, await response.read()
+
+        try:
+            json_body = await response.json(content_type=None)
+        except ValueError:
+            json_body = {}
+        if json_body is None:
+            json_body = {}
+
+        # if this is a background task, add the task id (or location) to the body
+        if response.status == 202:
+            if 'x-task-id' in response.headers:
+                json_body.update({"task_id": response.headers['x-task-id']})
+            if 'location' in response.headers:
+                json_body.update({"location": response.headers['location']})
+
+        if isinstance(json_body, dict) and retry and json_body.get('errorCode') == 60001:
+            await self._refresh_token(access_token)
+            return await self._call(uri, method, params, body, False, files, content_type, headers)
+
+        return response, json_body
+
+    # Public HTTP Methods
+
+    async def get(self, uri, params=None):
+        params = params or {}
+        if self.single_flight is not None:
+            return await self.single_flight.do_async(uri, params, lambda: self._get(uri, params))
+        return await self._get(uri, params)
+
+    async def _get(self, uri, params):
+        if self.cache is None or not self.cache.is_cacheable(uri):
+            return await self._do_call(uri, "GET", params=params)
+        hit, value, token = self.cache.lookup(uri, params)
+        if hit:
+            return value
+        response, value = await self._call(uri, "GET", params=params, headers=token.conditions)
+        if response.status == 304:
+            return self.cache.not_modified(token)
+        self.cache.store(token, value, response.headers)
+        return value
+
+    async def post_multi_part(self, uri, files):
+        #use empty string for content type so we don't set it
+        return await self._do_call(uri, "POST", files=files, content_type=None)
+
+    async def post(self, uri, json=None):
+        return await self._do_call(uri, "POST", body=json) if json is not None else await self._do_call(uri, "POST")
+
+    async def put(self, uri, json):
+        return await self._do_call(uri, "PUT", body=json)
+
+    async def patch(self, uri, json):
+        return await self._do_call(uri, "PATCH", body=json)
+
+    async def delete(self, uri):
+        return await self._do_call(uri, "DELETE")
+
+    async def download(self, uri, sink, params=None, chunk_size=64 * 1024, retry=True):
+        """Stream the body of a GET request to a file instead of holding it in memory.
+
+        Arguments:
+        uri -- The path to download, e.g. a task result URI.
+        sink -- A file path, or a writable binary file object.
+
+        Returns:
+        The number of bytes written.
+
+        Raises:
+        RestError -- If the API responds with an error instead of content.
+        """
+        await self._ensure_auth()
+        await self._renew_if_expiring()
+        response, access_token = await self._send("GET", uri, params, stream=True)
+        try:
+            if response.status >= 400:
+                try:
+                    error = await response.json(content_type=None)
+                except ValueError:
+                    error = await response.text()
+                if isinstance(error, dict) and retry and error.get('errorCode') == 60001:
+                    response.release()
+                    await self._refresh_token(access_token)
+                    return await self.download(uri, sink, params, chunk_size, False)
+                raise RestError(error)
+
+            if isinstance(sink, (str, os.PathLike)):
+                with open(sink, 'wb') as fileobj:
+                    return await _write_chunks(response, fileobj, chunk_size)
+            return await _write_chunks(response, sink, chunk_size)
+        finally:
+            response.release()
+
+
+async def _write_chunks(response, fileobj, chunk_size):
+    written = 0
+    async for chunk in response.content.iter_chunked(chunk_size):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
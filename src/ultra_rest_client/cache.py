@@ -0,0 +1,348 @@
+"""
+Response caching for the Ultra REST Client.
+
+This module provides an in-process cache for GET responses. Entries expire after
+a TTL, the least recently used entries are evicted once the cache is full, and
+writes made through the same connection invalidate the entries they affect.
+Expired entries that carry an ETag or Last-Modified validator are revalidated
+with a conditional request instead of being fetched again. SingleFlight collapses
+identical GETs that are in flight at the same time into one request.
+"""
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import Future
+from fnmatch import fnmatchcase
+import asyncio
+import copy
+import json
+import threading
+import time
+
+
+# Numeric codes of the record types the API accepts in RRSet URIs
+_TYPE_NAMES = {
+    '1': 'A', '2': 'NS', '5': 'CNAME', '6': 'SOA', '12': 'PTR', '13': 'HINFO', '15': 'MX',
+    '16': 'TXT', '17': 'RP', '28': 'AAAA', '33': 'SRV', '35': 'NAPTR', '43': 'DS', '44': 'SSHFP',
+    '52': 'TLSA', '64': 'SVCB', '65': 'HTTPS', '99': 'SPF', '257': 'CAA', '65282': 'APEXALIAS'
+}
+
+# The state of a cache miss, handed back to store() or not_modified()
+_Pending = namedtuple('_Pending', 'key zone generation global_generation stale conditions')
+
+
+class ResponseCache:
+    """
+    A thread-safe TTL + LRU cache of GET responses, keyed by URI and query parameters.
+
+    Invalidation is driven by the URI of each write:
+
+    - an RRSet write (/v1/zones/{zone}/rrsets/{type}/{owner}) drops the zone's RRSet
+      listings, the listings of that type, the RRSet itself and the zone's metadata;
+      a type may be given by name or number (A or 1), so both forms are matched;
+    - any other write under /v1/zones/{zone} drops everything cached for that zone;
+    - creating or deleting a zone also drops the zone listings;
+    - a /v1/batch request is invalidated operation by operation.
+
+    An expired entry with a validator is kept until it is revalidated: the next read
+    sends If-None-Match/If-Modified-Since, and a 304 Not Modified renews the entry
+    without transferring the body again. With ttl=0 every read is revalidated, which
+    turns change-detection polling of idle zones into a stream of empty 304s.
+    """
+
+    # Endpoints whose responses are safe to cache. Task, report and health check
+    # polling must always reach the server.
+    CACHEABLE = ("/v1/accounts*", "/v1/zones*", "/v3/zones*")
+    UNCACHEABLE = ("*/healthchecks*", "*/snapshot", "*/transfer")
+    ZONE_LISTINGS = ("/v1/zones", "/v3/zones", "/v1/accounts/*/zones")
+
+    def __init__(self, ttl=60, max_entries=1024, cacheable=CACHEABLE):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            ttl (float, optional): Seconds an entry stays valid. Defaults to 60.
+            max_entries (int, optional): Entries kept before the least recently used is evicted.
+                Defaults to 1024.
+            cacheable (tuple, optional): Shell-style URI patterns that may be cached.
+                Defaults to account, zone and RRSet reads.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = tuple(cacheable)
+        self._entries = OrderedDict()  # key -> (expires_at, value, validators)
+        self._by_zone = defaultdict(set)
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.revalidations = 0
+        self.not_modified_count = 0
+
+    def stats(self):
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'revalidations': self.revalidations,
+                'not_modified': self.not_modified_count
+            }
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._by_zone.clear()
+            self._generations.clear()
+
+    # Reads
+
+    def is_cacheable(self, uri):
+        path = _path(uri)
+        return any(fnmatchcase(path, p) for p in self.cacheable) and \
+            not any(fnmatchcase(path, p) for p in self.UNCACHEABLE)
+
+    def lookup(self, uri, params):
+        """
+        Look up a GET response.
+
+        Returns:
+            tuple: (hit, value, pending). On a miss, send pending.conditions as extra
+                request headers and pass pending to store() (or, on a 304, to
+                not_modified()) so that a response which raced with a write is not cached.
+        """
+        key = _key(uri, params)
+        zone = _zone_of(_path(uri))
+        stale, conditions = None, {}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, validators = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(value), None
+                if validators:
+                    stale, conditions = value, _conditions(validators)
+                    self.revalidations += 1
+                else:
+                    self._remove(key)
+            self.misses += 1
+            return False, None, _Pending(key, zone, self._generations[zone], self._generations[None], stale, conditions)
+
+    def store(self, pending, value, headers=None):
+        """Cache a successful GET response unless a write invalidated it while in flight."""
+        if not _cacheable_value(value):
+            return
+        validators = {name: headers[name] for name in ('ETag', 'Last-Modified') if name in (headers or {})}
+        with self._lock:
+            self._put(pending, copy.deepcopy(value), validators)
+
+    def not_modified(self, pending):
+        """Renew a revalidated entry after a 304 response and return its body."""
+        with self._lock:
+            self.not_modified_count += 1
+            entry = self._entries.get(pending.key)
+            if entry is not None:
+                self._put(pending, entry[1], entry[2])
+        return copy.deepcopy(pending.stale) if pending.stale is not None else {}
+
+    def _put(self, pending, value, validators):
+        if self._generations[pending.zone] != pending.generation or \
+                self._generations[None] != pending.global_generation:
+            return
+        self._entries[pending.key] = (time.monotonic() + self.ttl, value, validators)
+        self._entries.move_to_end(pending.key)
+        self._by_zone[pending.zone].add(pending.key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    # Writes
+
+    def invalidate(self, method, uri, body=None):
+        """Drop the entries affected by a write request."""
+        if method.upper() == "GET":
+            return
+        path = _path(uri)
+        if path == "/v1/batch":
+            for operation in _batch_operations(body):
+                self.invalidate(operation.get('method', ''), operation.get('uri', ''))
+            return
+
+        zone = _zone_of(path)
+        with self._lock:
+            if zone is None:
+                if path == "/v1/zones":
+                    self._invalidate_zone_listings()
+                return
+
+            parts = path.strip('/').split('/')
+            if len(parts) == 6 and parts[3] == 'rrsets':
+                rtype = parts[4]
+                self._invalidate_zone(zone, lambda p: (
+                    p[3:] == [] or
+                    p[3:] == ['rrsets'] or
+                    (len(p) > 4 and p[3] == 'rrsets' and _same_type(p[4], rtype))))
+            else:
+                self._invalidate_zone(zone, lambda p: True)
+                if len(parts) == 3 and method.upper() == "DELETE":
+                    self._invalidate_zone_listings()
+
+    def _invalidate_zone(self, zone, matches):
+        self._generations[zone] += 1
+        for key in list(self._by_zone.get(zone, ())):
+            if matches(key[0].strip('/').split('/')):
+                self._remove(key)
+                self.invalidations += 1
+
+    def _invalidate_zone_listings(self):
+        self._generations[None] += 1
+        for key in list(self._by_zone.get(None, ())):
+            if any(fnmatchcase(key[0], p) for p in self.ZONE_LISTINGS):
+                self._remove(key)
+                self.invalidations += 1
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        zone = _zone_of(key[0])
+        keys = self._by_zone.get(zone)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_zone[zone]
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical GETs into a single request.
+
+    The first caller for a (uri, params) key performs the request; callers that
+    arrive while it is in flight wait for it and receive their own copy of its
+    result (or its exception). Nothing is kept once the request completes.
+    """
+
+    def __init__(self):
+        self._flights = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def stats(self):
+        """Return the number of requests sent and of calls that shared one."""
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'executed': self.executed,
+                'coalesced': self.coalesced
+            }
+
+    def do(self, uri, params, fetch):
+        """
+        Return fetch(), sharing the call with any identical one already in flight.
+
+        Args:
+            uri (str): The request URI.
+            params (dict): The query parameters.
+            fetch (callable): Performs the request and returns its result.
+        """
+        key = _key(uri, params)
+        with self._lock:
+            future = self._flights.get(key)
+            if future is None:
+                future = self._flights[key] = Future()
+                self.executed += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(copy.deepcopy(result))
+        return result
+
+    async def do_async(self, uri, params, fetch):
+        """
+        The asyncio form of do(). fetch is a coroutine function; the shared request
+        runs as a task, so it isn't cancelled along with the caller that started it.
+        """
+        key = _key(uri, params)
+        with self._lock:
+            task = self._flights.get(key)
+            if task is None:
+                task = self._flights[key] = asyncio.ensure_future(fetch())
+                task.add_done_callback(lambda _: self._finish(key))
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _finish(self, key):
+        with self._lock:
+            self._flights.pop(key, None)
+
+
+def _path(uri):
+    return uri.split('?', 1)[0]
+
+
+def _key(uri, params):
+    path, _, query = uri.partition('?')
+    return (path, query, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+
+
+def _zone_of(path):
+    """Return the normalised zone name of a /v1|v3/zones/{zone}/... path, or None."""
+    parts = path.strip('/').split('/')
+    if len(parts) >= 3 and parts[0] in ('v1', 'v3') and parts[1] == 'zones':
+        return parts[2].rstrip('.').lower()
+    return None
+
+
+def _same_type(a, b):
+    """Whether two RRSet type segments may name the same type, e.g. 'A', 'a' and '1'."""
+    a, b = _type_name(a), _type_name(b)
+    # a number we can't name could be any type
+    return a == b or a.isdigit() or b.isdigit()
+
+
+def _type_name(rtype):
+    rtype = rtype.upper()
+    return _TYPE_NAMES.get(rtype, rtype)
+
+
+def _conditions(validators):
+    conditions = {}
+    if 'ETag' in validators:
+        conditions['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        conditions['If-Modified-Since'] = validators['Last-Modified']
+    return conditions
+
+
+def _batch_operations(body):
+    if isinstance(body, (str, bytes)):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return []
+    return [op for op in body or [] if isinstance(op, dict)]
+
+
+def _cacheable_value(value):
+    if isinstance(value, dict):
+        return 'errorCode' not in value and 'task_id' not in value and 'location' not in value
+    return False
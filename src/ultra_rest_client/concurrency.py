@@ -0,0 +1,133 @@
+"""
+Adaptive concurrency control for the Ultra REST Client.
+
+This module provides an additive-increase/multiplicative-decrease (AIMD) limit
+on the number of requests in flight, so bulk jobs find the level of parallelism
+the API will sustain instead of relying on a hand-picked thread count.
+"""
+import asyncio
+import threading
+import time
+
+
+class AdaptiveConcurrency:
+    """
+    An AIMD limit on in-flight requests, shared by every thread using a connection.
+
+    Each healthy response grows the limit by roughly `increase` per window of
+    `limit` requests. A throttled or failed response (429, 500, 502, 503, 504, a
+    connection error, or latency above `latency_target`) cuts it by the `decrease`
+    factor. Requests
+    that were already in flight when the limit was cut don't cut it again, so one
+    burst of 429s counts as a single congestion signal.
+    """
+
+    CONGESTION_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1.0, decrease=0.5, latency_target=None):
+        """
+        Initialize the AdaptiveConcurrency governor.
+
+        Args:
+            initial (int, optional): Starting limit. Defaults to 4.
+            min_limit (int, optional): The limit never drops below this. Defaults to 1.
+            max_limit (int, optional): The limit never grows above this. Defaults to 64.
+            increase (float, optional): Additive increase per window of healthy requests. Defaults to 1.
+            decrease (float, optional): Multiplicative factor applied on congestion. Defaults to 0.5.
+            latency_target (float, optional): Seconds; slower responses count as congestion.
+                Defaults to None (status codes only).
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters = []  # (loop, future) of coroutines waiting in acquire_async()
+        self.successes = 0
+        self.congestion_events = 0
+
+    @property
+    def limit(self):
+        """The current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """The number of requests currently in flight."""
+        return self._in_flight
+
+    def stats(self):
+        """Return a snapshot of the governor's metrics."""
+        with self._condition:
+            return {
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'successes': self.successes,
+                'congestion_events': self.congestion_events
+            }
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+
+        Returns:
+            float: The time the slot was granted; pass it back to release().
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    async def acquire_async(self):
+        """
+        Wait, without blocking the event loop, until a request may be sent.
+
+        Returns:
+            float: The time the slot was granted; pass it back to release().
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, started, status_code=None, error=False):
+        """
+        Return a slot and feed the outcome of the request into the limit.
+
+        Args:
+            started (float): The value returned by acquire().
+            status_code (int, optional): The HTTP status of the response.
+            error (bool, optional): True if the request failed without a response.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            congested = error or status_code in self.CONGESTION_STATUSES or (
+                self.latency_target is not None and now - started > self.latency_target)
+            if congested:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease)
+                    self._last_decrease = now
+                    self.congestion_events += 1
+            else:
+                self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+                self.successes += 1
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
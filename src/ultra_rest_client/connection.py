@@ -6,15 +6,21 @@
 __author__ = 'UltraDNS'
 
 # store the URL and the access/refresh tokens as state
+import os
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
 from .about import get_client_user_agent
+from .retry import RetryPolicy
+from .cache import SingleFlight
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class AuthError(Exception):
     def __init__(self, message):
         super().__init__(message)
+        self.message = message
 
     def __str__(self):
         return str(self.message)
@@ -23,16 +29,40 @@ class AuthError(Exception):
 class RestError(Exception):
     def __init__(self, message):
         super().__init__(message)
+        self.message = message
 
     def __str__(self):
         return str(self.message)
 
 
+def _file_positions(files):
+    """Remember where each file object in a multipart upload starts, so it can be re-sent."""
+    positions = {}
+    for name, value in (files or {}).items():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, 'seek') and hasattr(fileobj, 'tell'):
+            positions[name] = (fileobj, fileobj.tell())
+    return positions
+
+
+def _rewind_files(files, positions):
+    for fileobj, position in positions.values():
+        fileobj.seek(position)
+
+
+def _write_chunks(response, fileobj, chunk_size):
+    written = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
 class RestApiConnection:
     # Don't let users set these headers
     FORBIDDEN_HEADERS = {"Authorization", "Content-Type", "Accept"}
 
-    def __init__(self, use_http=False, host="api.ultradns.com", access_token: str = "", refresh_token: str = "", custom_headers=None, proxy=None, verify_https=True):
+    def __init__(self, use_http=False, host="api.ultradns.com", access_token: str = "", refresh_token: str = "", custom_headers=None, proxy=None, verify_https=True, pool_connections=10, pool_maxsize=10, keepalive_timeout=None, token_refresh_margin=60, retry_policy=None, rate_limiter=None, concurrency=None, cache=None, coalesce_requests=False):
         self.use_http = use_http
         self.host = host
         self.access_token = access_token
@@ -40,6 +70,70 @@ class RestApiConnection:
         self.custom_headers = custom_headers or {}
         self.proxy = proxy
         self.verify_https = verify_https
+        # Connection pool settings for the shared session
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._last_used = None
+        # Guards the token pair so only one refresh is in flight at a time
+        self._token_lock = threading.Lock()
+        self._failed_refresh = None
+        # Monotonic deadline of the access token, known once we authenticate
+        self.token_expires_at = None
+        self.token_lifetime = None
+        self.token_refresh_margin = token_refresh_margin
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Optional RateLimiter shared by every thread using this connection
+        self.rate_limiter = rate_limiter
+        # Optional AdaptiveConcurrency governor bounding requests in flight
+        self.concurrency = concurrency
+        # Optional ResponseCache for GETs, invalidated by writes on this connection
+        self.cache = cache
+        # Optional SingleFlight sharing one request between identical concurrent GETs
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        # Per-thread DeferredBatch that records writes instead of sending them
+        self._deferred = threading.local()
+
+    # Session Lifecycle
+    # All requests, including auth and refresh, share one requests.Session so
+    # TCP/TLS connections to the API host are kept alive and reused.
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get_session(self):
+        """Return the shared session, recycling pooled connections that sat idle past keepalive_timeout."""
+        with self._session_lock:
+            now = time.monotonic()
+            if self._session is None:
+                self._session = self._create_session()
+            elif self.keepalive_timeout is not None and self._last_used is not None \
+                    and now - self._last_used > self.keepalive_timeout:
+                # the server has likely dropped these sockets already
+                for adapter in self._session.adapters.values():
+                    adapter.close()
+            self._last_used = now
+            return self._session
+
+    def close(self):
+        """Close the shared session and release all pooled connections."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                self._last_used = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     # Authentication
     # We need the ability to take in a username and password and get
@@ -55,16 +149,15 @@ class RestApiConnection:
             "username":username,
             "password":password
         }
-        response = requests.post(
+        response = self._get_session().post(
             f"{host}/v1/authorization/token", 
             data=payload,
             proxies=self.proxy,
             verify=self.verify_https
         )
         if response.status_code == requests.codes.OK:
-            json_body = response.json()
-            self.access_token = json_body.get('accessToken')
-            self.refresh_token = json_body.get('refreshToken')
+            with self._token_lock:
+                self._store_tokens(response.json())
         else:
             raise AuthError(response.json())
 
@@ -74,19 +167,66 @@ class RestApiConnection:
             "grant_type":"refresh_token",
             "refresh_token":self.refresh_token
         }
-        response = requests.post(
+        response = self._get_session().post(
             f"{host}/v1/authorization/token", 
             data=payload,
             proxies=self.proxy,
             verify=self.verify_https
         )
         if response.status_code == requests.codes.OK:
-            json_body = response.json()
-            self.access_token = json_body.get('accessToken')
-            self.refresh_token = json_body.get('refreshToken')
+            self._store_tokens(response.json())
         else:
             raise AuthError(response.json())
 
+    def _store_tokens(self, json_body):
+        """Keep the token pair and work out when the access token expires."""
+        self.access_token = json_body.get('accessToken')
+        self.refresh_token = json_body.get('refreshToken')
+        self._failed_refresh = None
+        try:
+            self.token_lifetime = float(json_body['expiresIn'])
+            self.token_expires_at = time.monotonic() + self.token_lifetime
+        except (KeyError, TypeError, ValueError):
+            self.token_lifetime = self.token_expires_at = None
+
+    def _token_expiring(self):
+        """True if the access token is within token_refresh_margin seconds of expiring.
+
+        The margin is capped at half the token's lifetime, so a short-lived token isn't
+        refreshed on every request.
+        """
+        if self.token_expires_at is None or not self.refresh_token:
+            return False
+        margin = min(self.token_refresh_margin, self.token_lifetime / 2)
+        return time.monotonic() >= self.token_expires_at - margin
+
+    def _renew_if_expiring(self):
+        """Refresh ahead of expiry so requests don't fail with 60001 first."""
+        if self._token_expiring():
+            try:
+                self._refresh_token(self.access_token)
+            except AuthError:
+                # the current token may still be good; the 60001 path will report it
+                pass
+
+    def _refresh_token(self, stale_token):
+        """Refresh the token pair once on behalf of every caller that saw stale_token expire.
+
+        Callers that arrive while a refresh is in flight block on the lock, then
+        find the token already replaced and return without refreshing again.
+        """
+        with self._token_lock:
+            if self.access_token != stale_token:
+                return
+            if self._failed_refresh is not None and self._failed_refresh[0] == stale_token:
+                # the refresh token was already rejected, don't hammer the endpoint
+                raise self._failed_refresh[1]
+            try:
+                self._refresh()
+            except AuthError as e:
+                self._failed_refresh = (stale_token, e)
+                raise
+
     # Private Utility Methods
 
     def _validate_custom_headers(self, headers):
@@ -95,17 +235,21 @@ class RestApiConnection:
             if header in self.FORBIDDEN_HEADERS:
                 raise ValueError(f"Custom headers cannot include '{header}'.")
 
-    def _build_headers(self, content_type):
+    def _build_headers(self, content_type, access_token=None, extra_headers=None):
         """Construct headers by merging default, custom, and per-request headers."""
+        if access_token is None:
+            access_token = self.access_token
         headers = {
             "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {access_token}",
             "User-Agent": get_client_user_agent()
         }
         if content_type:
             headers["Content-Type"] = content_type
 
         headers.update(self.custom_headers)
+        if extra_headers:
+            headers.update(extra_headers)
 
         return headers
 
@@ -118,24 +262,76 @@ class RestApiConnection:
 
     # Main Request Method
 
-    def _do_call(self, uri, method, params=None, body=None, retry=True, files=None, content_type="application/json"):
+    def _send(self, method, uri, params=None, body=None, files=None, content_type="application/json", stream=False, headers=None):
+        """Send a request, replaying it under the retry policy on throttling, 5xx or connection errors.
+
+        Returns the final response together with the access token it was sent with.
+        With stream=True the body is left unread for the caller to consume.
+        """
         host = self._get_connection()
-        response = requests.request(
-            method,
-            host + uri,
-            params=params,
-            data=body,
-            headers=self._build_headers(content_type),
-            files=files,
-            proxies=self.proxy,
-            verify=self.verify_https
-        )
-        if response.status_code == requests.codes.NO_CONTENT:
-            return {}
+        positions = _file_positions(files)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            _rewind_files(files, positions)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(method, uri)
+            access_token = self.access_token
+            slot = self.concurrency.acquire() if self.concurrency is not None else None
+            try:
+                response = self._get_session().request(
+                    method,
+                    host + uri,
+                    params=params,
+                    data=body,
+                    headers=self._build_headers(content_type, access_token, headers),
+                    files=files,
+                    proxies=self.proxy,
+                    verify=self.verify_https,
+                    stream=stream
+                )
+            except Exception as e:
+                if slot is not None:
+                    self.concurrency.release(slot, error=True)
+                if not isinstance(e, requests.exceptions.ConnectionError):
+                    raise
+                delay = self.retry_policy.get_delay(attempt, started, error=e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            if slot is not None:
+                self.concurrency.release(slot, response.status_code)
+
+            if self.retry_policy.retries_status(response.status_code):
+                delay = self.retry_policy.get_delay(attempt, started, retry_after=response.headers.get('Retry-After'))
+                if delay is not None:
+                    response.close()
+                    time.sleep(delay)
+                    continue
+
+            return response, access_token
 
-        if response.status_code == requests.codes.TOO_MANY:
-            time.sleep(1)
-            return self._do_call(uri, method, params, body, False)
+    def _do_call(self, uri, method, params=None, body=None, retry=True, files=None, content_type="application/json"):
+        deferred = getattr(self._deferred, 'batch', None)
+        if deferred is not None and deferred.accepts(method, uri, files):
+            return deferred.record(method, uri, body)
+        return self._call(uri, method, params, body, retry, files, content_type)[1]
+
+    def _call(self, uri, method, params=None, body=None, retry=True, files=None, content_type="application/json", headers=None):
+        """Like _do_call, but returns the final response along with its parsed body."""
+        self._renew_if_expiring()
+        try:
+            response, access_token = self._send(method, uri, params, body, files, content_type, headers=headers)
+        finally:
+            # a write may have been applied even if we never saw the response
+            if self.cache is not None and method != "GET":
+                self.cache.invalidate(method, uri, body)
+        if response.status_code == requests.codes.NO_CONTENT:
+            return response, {}
+        if response.status_code == requests.codes.NOT_MODIFIED:
+            return response, None
 
         # some endpoints have no content-type header
         if 'content-type' not in response.headers:
@@ -143,11 +339,11 @@ class RestApiConnection:
 
         # if the content-type is text/plain just return the text
         if response.headers.get('content-type') == 'text/plain':
-            return response.text
+            return response, response.text
 
         # Return the bytes. Zone exports produce zip files when done in batch.
         if response.headers.get('content-type') == 'application/zip':
-            return response.content
+            return response, response.content
 
         try:
           json_body = response.json()
@@ -162,16 +358,31 @@ class RestApiConnection:
             json_body.update({"location": response.headers['location']})
 
         if isinstance(json_body, dict) and retry and json_body.get('errorCode') == 60001:
-            self._refresh()
-            return self._do_call(uri, method, params, body, False)
+            self._refresh_token(access_token)
+            return self._call(uri, method, params, body, False, files, content_type, headers)
 
-        return json_body
+        return response, json_body
 
     # Public HTTP Methods
 
     def get(self, uri, params=None):
         params = params or {}
-        return self._do_call(uri, "GET", params=params)
+        if self.single_flight is not None:
+            return self.single_flight.do(uri, params, lambda: self._get(uri, params))
+        return self._get(uri, params)
+
+    def _get(self, uri, params):
+        if self.cache is None or not self.cache.is_cacheable(uri):
+            return self._do_call(uri, "GET", params=params)
+        hit, value, token = self.cache.lookup(uri, params)
+        if hit:
+            return value
+        # revalidate a stale entry with If-None-Match/If-Modified-Since
+        response, value = self._call(uri, "GET", params=params, headers=token.conditions)
+        if response.status_code == requests.codes.NOT_MODIFIED:
+            return self.cache.not_modified(token)
+        self.cache.store(token, value, response.headers)
+        return value
 
     def post_multi_part(self, uri, files):
         #use empty string for content type so we don't set it
@@ -188,6 +399,41 @@ class RestApiConnection:
 
     def delete(self, uri):
         return self._do_call(uri, "DELETE")
+
+    def download(self, uri, sink, params=None, chunk_size=64 * 1024, retry=True):
+        """Stream the body of a GET request to a file instead of holding it in memory.
+
+        Arguments:
+        uri -- The path to download, e.g. a task result URI.
+        sink -- A file path, or a writable binary file object.
+
+        Keyword Arguments:
+        params -- Query parameters for the request.
+        chunk_size -- Number of bytes read and written at a time. Defaults to 64 KiB.
+
+        Returns:
+        The number of bytes written.
+
+        Raises:
+        RestError -- If the API responds with an error instead of content.
+        """
+        self._renew_if_expiring()
+        response, access_token = self._send("GET", uri, params, stream=True)
+        with response:
+            if response.status_code >= 400:
+                try:
+                    error = response.json()
+                except requests.exceptions.JSONDecodeError:
+                    error = response.text
+                if isinstance(error, dict) and retry and error.get('errorCode') == 60001:
+                    self._refresh_token(access_token)
+                    return self.download(uri, sink, params, chunk_size, False)
+                raise RestError(error)
+
+            if isinstance(sink, (str, os.PathLike)):
+                with open(sink, 'wb') as fileobj:
+                    return _write_chunks(response, fileobj, chunk_size)
+            return _write_chunks(response, sink, chunk_size)
     
     # Public Utility Methods
     
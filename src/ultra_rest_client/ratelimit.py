@@ -0,0 +1,109 @@
+"""
+Client-side rate limiting for the Ultra REST Client.
+
+This module provides token buckets that pace requests to a known budget, so
+bulk jobs run at the highest sustainable rate instead of discovering the limit
+through 429 responses.
+"""
+import threading
+import time
+from fnmatch import fnmatchcase
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+
+    Callers reserve a token and are told how long to wait for it. Reservations
+    are granted in arrival order, so waiting callers are released evenly at the
+    configured rate rather than all at once.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (float, optional): Bucket capacity, i.e. how many requests may be sent
+                back to back after an idle period. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero.")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket, going into debt if it is empty.
+
+        Returns:
+            float: Seconds the caller must wait before sending its request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Paces requests across every thread that shares a connection.
+
+    A global bucket can be combined with buckets for specific HTTP verbs and for
+    URI families (shell-style patterns such as "/v1/zones/*/rrsets*"). A request
+    waits for the slowest bucket that applies to it.
+    """
+
+    def __init__(self, rate=None, burst=None, per_method=None, per_uri=None):
+        """
+        Initialize the RateLimiter.
+
+        Args:
+            rate (float, optional): Requests per second allowed overall. Defaults to None (unlimited).
+            burst (float, optional): Burst size of the overall bucket. Defaults to max(1, rate).
+            per_method (dict, optional): Maps an HTTP verb ("GET", "POST", ...) to a rate,
+                or to a (rate, burst) tuple.
+            per_uri (dict, optional): Maps a URI pattern to a rate, or to a (rate, burst) tuple.
+                Only the first matching pattern applies.
+
+        Example:
+            RateLimiter(rate=20, burst=40, per_method={"POST": 5}, per_uri={"/v1/zones/*/rrsets*": (10, 10)})
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.method_buckets = {method.upper(): _make_bucket(spec) for method, spec in (per_method or {}).items()}
+        self.uri_buckets = [(pattern, _make_bucket(spec)) for pattern, spec in (per_uri or {}).items()]
+
+    def reserve(self, method, uri):
+        """Reserve a slot for a request and return the number of seconds to wait for it."""
+        delay = 0.0
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+        method_bucket = self.method_buckets.get(method.upper())
+        if method_bucket is not None:
+            delay = max(delay, method_bucket.reserve())
+        path = uri.split('?', 1)[0]
+        for pattern, uri_bucket in self.uri_buckets:
+            if fnmatchcase(path, pattern):
+                delay = max(delay, uri_bucket.reserve())
+                break
+        return delay
+
+    def acquire(self, method, uri):
+        """Block until the request may be sent."""
+        delay = self.reserve(method, uri)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _make_bucket(spec):
+    if isinstance(spec, (tuple, list)):
+        return TokenBucket(*spec)
+    return TokenBucket(spec)
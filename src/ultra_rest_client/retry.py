@@ -0,0 +1,95 @@
+"""
+Retry policy for the Ultra REST Client.
+
+This module decides whether a failed request should be replayed and how long
+to wait first, using exponential backoff with full jitter and honoring any
+Retry-After header sent by the API.
+"""
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for throttled and unavailable responses.
+
+    The connection asks the policy for a delay after each failed attempt; a return
+    value of None means the request should not be retried. Subclass and override
+    get_delay() to plug in a different strategy.
+    """
+
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(self, max_attempts=5, backoff_base=0.5, backoff_max=30, deadline=None, retry_statuses=RETRY_STATUSES, retry_connection_errors=True):
+        """
+        Initialize the RetryPolicy.
+
+        Args:
+            max_attempts (int, optional): Total attempts per request, including the first.
+                Defaults to 5. Use 1 to disable retries.
+            backoff_base (float, optional): Base delay in seconds for the first retry. Defaults to 0.5.
+            backoff_max (float, optional): Upper bound on the backoff window in seconds. Defaults to 30.
+            deadline (float, optional): Total seconds a request may spend retrying, measured from the
+                first attempt. Defaults to None (bounded only by max_attempts).
+            retry_statuses (iterable, optional): HTTP status codes that trigger a retry.
+                Defaults to 429, 502, 503 and 504.
+            retry_connection_errors (bool, optional): Whether to retry when the connection fails.
+                Defaults to True.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+
+    def retries_status(self, status_code):
+        """Return True if a response with this status code may be retried."""
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt):
+        """Return a full-jitter delay for the given (1-based) failed attempt."""
+        window = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, window)
+
+    def get_delay(self, attempt, started, retry_after=None, error=None):
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            attempt (int): The number of attempts made so far.
+            started (float): time.monotonic() at the first attempt.
+            retry_after (str, optional): The Retry-After header of the response, if any.
+            error (Exception, optional): The connection error, if the request never got a response.
+
+        Returns:
+            float or None: Seconds to wait before the next attempt, or None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if error is not None and not self.retry_connection_errors:
+            return None
+
+        delay = self.backoff(attempt)
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return None
+        return delay
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (delta-seconds or HTTP-date) to seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
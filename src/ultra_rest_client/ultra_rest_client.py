@@ -5,11 +5,19 @@
 # of their respective owners.
 __author__ = 'UltraDNS'
 from .connection import RestApiConnection
+from .utils.batching import bulk_batch, DeferredBatch
+from .utils.exports import iter_zone_files, bulk_export
+from .utils.imports import import_rrsets
+from .utils.pagination import iter_cursor_pages, iter_offset_pages
+from .utils.polling import PollingStrategy
+from .utils.reconcile import reconcile_zone
+from .utils.zonefile import iter_zone_records, group_rrsets
 import json
+import tempfile
 import time
 
 class RestApiClient:
-    def __init__(self, bu: str, pr: str = None, use_token: bool = False, use_http: bool =False, host: str = "api.ultradns.com", custom_headers=None, proxy=None, verify_https=True):
+    def __init__(self, bu: str, pr: str = None, use_token: bool = False, use_http: bool =False, host: str = "api.ultradns.com", custom_headers=None, proxy=None, verify_https=True, pool_connections=10, pool_maxsize=10, keepalive_timeout=None, token_refresh_margin=60, retry_policy=None, rate_limiter=None, concurrency=None, cache=None, coalesce_requests=False, polling=None):
         """Initialize a Rest API Client.
 
         Arguments:
@@ -20,10 +28,26 @@ class RestApiClient:
         Keyword Arguments:
         use_http (bool, optional) -- For internal testing purposes only, lets developers use http instead of https.
         host (str) -- Allows you to point to a server other than the production server.
+        pool_connections (int) -- Number of per-host connection pools kept by the shared session. Defaults to 10.
+        pool_maxsize (int) -- Maximum number of connections kept alive per host. Defaults to 10.
+        keepalive_timeout (float, optional) -- Seconds a pooled connection may sit idle before it is dropped
+                                               instead of reused. Defaults to None (never expire).
+        token_refresh_margin (float) -- Refresh the access token this many seconds before it expires, but never
+                                        earlier than half way through its lifetime. Defaults to 60.
+        retry_policy (RetryPolicy, optional) -- Controls how throttled (429), unavailable (502/503/504) and failed
+                                                connections are retried. Defaults to RetryPolicy().
+        rate_limiter (RateLimiter, optional) -- Paces requests to a known request budget. Defaults to None.
+        concurrency (AdaptiveConcurrency, optional) -- Self-tuning limit on requests in flight. Defaults to None.
+        cache (ResponseCache, optional) -- Caches GET responses; writes through this client invalidate the
+                                          entries they affect. Defaults to None (no caching).
+        coalesce_requests (bool) -- Share one request between identical GETs made concurrently. Defaults to False.
+        polling (PollingStrategy, optional) -- How export_zone and the other methods that wait for a background
+                                               task poll it. Defaults to PollingStrategy().
 
         Raises:
         ValueError -- If `pr` is not provided when `use_token` is True.
         """
+        self.polling = polling or PollingStrategy()
 
         if use_token:
             self.access_token = bu
@@ -35,7 +59,16 @@ class RestApiClient:
                 pr, 
                 custom_headers=custom_headers,
                 proxy=proxy,
-                verify_https=verify_https
+                verify_https=verify_https,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                keepalive_timeout=keepalive_timeout,
+                token_refresh_margin=token_refresh_margin,
+                retry_policy=retry_policy,
+                rate_limiter=rate_limiter,
+                concurrency=concurrency,
+                cache=cache,
+                coalesce_requests=coalesce_requests
             )
             if not self.refresh_token:
                 print(
@@ -48,10 +81,30 @@ class RestApiClient:
                 host, 
                 custom_headers=custom_headers,
                 proxy=proxy,
-                verify_https=verify_https
+                verify_https=verify_https,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                keepalive_timeout=keepalive_timeout,
+                token_refresh_margin=token_refresh_margin,
+                retry_policy=retry_policy,
+                rate_limiter=rate_limiter,
+                concurrency=concurrency,
+                cache=cache,
+                coalesce_requests=coalesce_requests
             )
             self.rest_api_connection.auth(bu, pr)
 
+    # Lifecycle
+    def close(self):
+        """Closes the underlying connection and releases its pooled HTTP connections."""
+        self.rest_api_connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     # Zones
     # create a primary zone
     def create_primary_zone(self, account_name, zone_name):
@@ -233,6 +286,23 @@ class RestApiClient:
         params = build_params(q, kwargs)
         return self.rest_api_connection.get(uri, params)
 
+    # iterate over all zones for account
+    def iter_zones_of_account(self, account_name, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Yields every zone of the specified account, fetching pages in parallel.
+
+        Arguments:
+        account_name -- The name of the account.
+
+        Keyword Arguments:
+        q, sort, reverse -- See get_zones_of_account.
+        page_size -- Zones requested per page. Defaults to 500.
+        max_workers -- Pages fetched concurrently. Defaults to 4.
+        ordered -- Yield zones in list order. Set to False to yield pages as they arrive. Defaults to True.
+
+        """
+        return self._iter_offset(lambda **params: self.get_zones_of_account(account_name, q, **params),
+                                 'zones', page_size, max_workers, ordered, kwargs)
+
     # list zones for all user accounts
     def get_zones(self, q=None, **kwargs):
         """Returns a list of zones across all of the user's accounts.
@@ -258,6 +328,20 @@ class RestApiClient:
         params = build_params(q, kwargs)
         return self.rest_api_connection.get(uri, params)
 
+    # iterate over all zones for all user accounts
+    def iter_zones(self, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Yields every zone across all of the user's accounts, fetching pages in parallel.
+
+        Keyword Arguments:
+        q, sort, reverse -- See get_zones.
+        page_size -- Zones requested per page. Defaults to 500.
+        max_workers -- Pages fetched concurrently. Defaults to 4.
+        ordered -- Yield zones in list order. Set to False to yield pages as they arrive. Defaults to True.
+
+        """
+        return self._iter_offset(lambda **params: self.get_zones(q, **params),
+                                 'zones', page_size, max_workers, ordered, kwargs)
+
     # list zones for all user accounts using v3 url
     def get_zones_v3(self, q=None, **kwargs):
         """Returns a list of zones across all of the user's accounts.
@@ -282,6 +366,31 @@ class RestApiClient:
         params = build_params(q, kwargs)
         return self.rest_api_connection.get(uri, params)
 
+    # iterate over all zones using v3 cursors
+    def iter_zones_v3(self, q=None, prefetch=True, **kwargs):
+        """Yields every zone across all of the user's accounts, following v3 cursors lazily.
+
+        Only one page is held in memory at a time (two while prefetching), so this scales
+        to accounts with hundreds of thousands of zones.
+
+        Keyword Arguments:
+        q -- The search parameters, in a dict. See get_zones_v3.
+        prefetch -- Fetch the next page in the background while the current one is
+                    being consumed. Defaults to True.
+        sort -- The sort column used to order the list. See get_zones_v3.
+        reverse -- Whether the list is ascending(False) or descending(True)
+        limit -- The page size.
+
+        Yields:
+        Zone dicts, one at a time.
+        """
+        def fetch_page(cursor):
+            params = dict(kwargs)
+            if cursor is not None:
+                params['cursor'] = cursor
+            return self.get_zones_v3(q, **params)
+        return iter_cursor_pages(fetch_page, 'zones', prefetch)
+
     # get zone metadata
     def get_zone_metadata(self, zone_name):
         """Returns the metadata for the specified zone.
@@ -364,6 +473,30 @@ class RestApiClient:
         params = build_params(q, kwargs)
         return self.rest_api_connection.get(uri, params)
 
+    # iterate over all rrsets for a zone
+    def iter_rrsets(self, zone_name, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Yields every RRSet in the specified zone, fetching pages in parallel.
+
+        The first page is read to learn the total count, then the remaining pages are
+        requested concurrently.
+
+        Arguments:
+        zone_name -- The name of the zone.
+
+        Keyword Arguments:
+        q, sort, reverse -- See get_rrsets.
+        page_size -- RRSets requested per page. Defaults to 500.
+        max_workers -- Pages fetched concurrently. Defaults to 4.
+        ordered -- Yield RRSets in list order. Set to False to yield pages as they arrive. Defaults to True.
+
+        """
+        return self._iter_offset(lambda **params: self.get_rrsets(zone_name, q, **params),
+                                 'rrSets', page_size, max_workers, ordered, kwargs)
+
+    def fetch_all_rrsets(self, zone_name, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Returns a list of every RRSet in the specified zone. See iter_rrsets."""
+        return list(self.iter_rrsets(zone_name, q, page_size, max_workers, ordered, **kwargs))
+
     # list rrsets by type for a zone
     # q	The query used to construct the list. Query operators are ttl, owner, and value
     def get_rrsets_by_type(self, zone_name, rtype, q=None, **kwargs):
@@ -392,6 +525,29 @@ class RestApiClient:
         params = build_params(q, kwargs)
         return self.rest_api_connection.get(uri, params)
 
+    # iterate over all rrsets of a type for a zone
+    def iter_rrsets_by_type(self, zone_name, rtype, q=None, page_size=500, max_workers=4, ordered=True, **kwargs):
+        """Yields every RRSet of the specified type in the zone, fetching pages in parallel.
+
+        Arguments:
+        zone_name -- The name of the zone.
+        rtype -- The type of the RRSets.
+
+        Keyword Arguments:
+        q, sort, reverse -- See get_rrsets_by_type.
+        page_size -- RRSets requested per page. Defaults to 500.
+        max_workers -- Pages fetched concurrently. Defaults to 4.
+        ordered -- Yield RRSets in list order. Set to False to yield pages as they arrive. Defaults to True.
+
+        """
+        return self._iter_offset(lambda **params: self.get_rrsets_by_type(zone_name, rtype, q, **params),
+                                 'rrSets', page_size, max_workers, ordered, kwargs)
+
+    def _iter_offset(self, get_page, items_key, page_size, max_workers, ordered, kwargs):
+        def fetch_page(offset, limit):
+            return get_page(**dict(kwargs, offset=offset, limit=limit))
+        return iter_offset_pages(fetch_page, items_key, page_size, max_workers, ordered)
+
     # list rrsets by type and owner for a zone
     # q	The query used to construct the list. Query operators are ttl, owner, and value
     def get_rrsets_by_type_owner(self, zone_name, rtype, owner_name, q=None, **kwargs):
@@ -599,6 +755,118 @@ class RestApiClient:
         """
         return self.rest_api_connection.post("/v1/batch", json.dumps(batch_list))
 
+    def batch_bulk(self, batch_list, chunk_size=100, max_workers=4):
+        """Sends any number of requests as concurrent batches.
+
+        The list is split into chunks of `chunk_size` requests, which are sent as
+        separate /v1/batch calls, up to `max_workers` at a time. Requests that come back
+        throttled or unavailable are retried under the connection's retry policy.
+
+        Arguments:
+        batch_list -- a list of request objects, in the format accepted by batch().
+
+        Keyword Arguments:
+        chunk_size -- Requests per /v1/batch call. Defaults to 100.
+        max_workers -- Batch calls in flight at once. Defaults to 4.
+
+        Returns:
+        A list with one {'status': ..., 'response': ...} result per request, in the order of `batch_list`.
+        """
+        return bulk_batch(self, batch_list, chunk_size, max_workers)
+
+    def deferred(self, chunk_size=100, max_workers=1):
+        """Returns a context manager that turns this client's writes into batches.
+
+        Inside the `with` block, write methods called from the same thread (create_rrset,
+        edit_rrset, delete_rrset, create_rd_pool, ...) are recorded instead of sent and
+        return a concurrent.futures.Future. Reads are still sent immediately. On exit the
+        recorded writes are sent in as few /v1/batch calls as possible, and each Future
+        resolves to that write's {'status': ..., 'response': ...} result.
+
+        Keyword Arguments:
+        chunk_size -- Requests per /v1/batch call. Defaults to 100.
+        max_workers -- Batch calls in flight at once. Defaults to 1, which applies the writes in order.
+
+        Returns:
+        A DeferredBatch. Its flush() method sends the writes recorded so far.
+        """
+        return DeferredBatch(self, chunk_size, max_workers)
+
+    def reconcile_zone(self, zone_name, desired_rrsets, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4, keep_pools=True):
+        """Makes a zone contain exactly the desired RRSets, with the fewest changes.
+
+        The zone is read page by page and compared with `desired_rrsets`. Missing RRSets are
+        created, RRSets whose rdata alone changed are patched, those whose TTL or profile
+        changed are replaced, and undesired ones are deleted, all through batched requests.
+
+        Arguments:
+        zone_name -- The name of the zone.
+        desired_rrsets -- The RRSets the zone should contain, as dicts in the format returned by
+                          get_rrsets ('ownerName', 'rrtype', 'ttl', 'rdata', optional 'profile').
+                          Owner names may be relative, and rdata may be a single string.
+
+        Keyword Arguments:
+        dry_run -- Compute the plan without applying it. Defaults to False.
+        manage_apex -- Also reconcile the SOA and apex NS records. Defaults to False.
+        chunk_size -- Requests per /v1/batch call. Defaults to 100.
+        max_workers -- Batch calls in flight at once. Defaults to 4.
+        keep_pools -- Keep live pools whose desired RRSet has no profile as pools, patching
+                      only their rdata. Defaults to True.
+
+        Returns:
+        A (plan, results) tuple. plan is a ZonePlan; results holds one batch result per operation
+        in plan.operations().
+        """
+        return reconcile_zone(self, zone_name, desired_rrsets, dry_run, manage_apex, chunk_size, max_workers, keep_pools)
+
+    def sync_zone_from_file(self, zone_name, bind_file, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4):
+        """Updates a live zone to match a BIND zone file, sending only the differences.
+
+        Unlike create_primary_zone_by_upload with forceImport, this does not re-import the
+        zone: the file is parsed locally, compared with the zone's current RRSets, and only
+        the RRSets that differ are created, edited or deleted, through batched requests.
+        A zone file can't describe pools, so live pools keep their profile.
+
+        Arguments:
+        zone_name -- The name of the zone. Relative names in the file are resolved against it
+                     until the file sets $ORIGIN.
+        bind_file -- The path to the BIND zone file, or an open text file.
+
+        Keyword Arguments:
+        dry_run -- Compute the plan without applying it. Defaults to False.
+        manage_apex -- Also sync the SOA and apex NS records. Defaults to False.
+        chunk_size -- Requests per /v1/batch call. Defaults to 100.
+        max_workers -- Batch calls in flight at once. Defaults to 4.
+
+        Returns:
+        A (plan, results) tuple, as returned by reconcile_zone.
+        """
+        desired_rrsets = group_rrsets(iter_zone_records(bind_file, origin=zone_name))
+        return self.reconcile_zone(zone_name, desired_rrsets, dry_run, manage_apex, chunk_size, max_workers)
+
+    def import_rrsets(self, source, fmt=None, zone_name=None, window=10000, chunk_size=100, max_workers=4, progress=None):
+        """Creates RRSets from a CSV or JSON Lines file, using concurrent batches.
+
+        Each row is one record, with zone, owner, type, ttl and rdata fields (CSV needs a header row).
+        Rows for the same zone, type and owner are merged into one RRSet. The file is read a window
+        of rows at a time, so rows belonging to one RRSet should be near each other.
+
+        Arguments:
+        source -- A path to the file, or an open text file.
+
+        Keyword Arguments:
+        fmt -- 'csv' or 'jsonl'. Defaults to the file extension.
+        zone_name -- The zone for rows without a zone field.
+        window -- Rows grouped and sent together. Defaults to 10000.
+        chunk_size -- Requests per /v1/batch call. Defaults to 100.
+        max_workers -- Batch calls in flight at once. Defaults to 4.
+        progress -- Called with the running totals ('rows', 'rrsets', 'created', 'failed') after each window.
+
+        Returns:
+        A dict of totals plus 'errors', with one entry per row that was not imported, giving its row number and the error.
+        """
+        return import_rrsets(self, source, fmt, zone_name, window, chunk_size, max_workers, progress)
+
     # Create an RD Pool
     # Sample JSON for an RD pool -- see the REST API docs for their descriptions
     # {
@@ -940,19 +1208,96 @@ class RestApiClient:
         zone_name -- The name of the zone being returned. A single zone as a string.
     
         """
-        zonejson = json.dumps({'zoneNames': [zone_name]})
+        task_id = self._start_export([zone_name])
+        result = self.rest_api_connection.get(f"/v1/tasks/{task_id}/result")
+        self.clear_task(task_id)
+        return result
+
+    # export zones to a file
+    def export_zones_to_file(self, zone_names, sink, chunk_size=64 * 1024):
+        """Exports one or more zones and streams the result to a file in chunks.
+
+        A multi-zone export is a zip archive with one bind file per zone; a single zone
+        export is the bind file itself. Use iter_zone_files() to read the archive back.
+
+        Arguments:
+        zone_names -- A zone name, or a list of zone names.
+        sink -- A file path, or a writable binary file object.
+
+        Keyword Arguments:
+        chunk_size -- Number of bytes written at a time. Defaults to 64 KiB.
+
+        Returns:
+        The number of bytes written.
+        """
+        if isinstance(zone_names, str):
+            zone_names = [zone_names]
+        task_id = self._start_export(zone_names)
+        written = self.rest_api_connection.download(f"/v1/tasks/{task_id}/result", sink, chunk_size=chunk_size)
+        self.clear_task(task_id)
+        return written
+
+    def iter_exported_zones(self, zone_names, chunk_size=64 * 1024):
+        """Exports zones and yields their bind files one at a time.
+
+        The export is streamed to a temporary file on disk and each zone file is read
+        from it as it is needed, so memory use stays flat however large the export is.
+
+        Arguments:
+        zone_names -- A zone name, or a list of zone names.
+
+        Keyword Arguments:
+        chunk_size -- Number of bytes written at a time while downloading. Defaults to 64 KiB.
+
+        Yields:
+        (zone_name, bind_text) tuples.
+        """
+        if isinstance(zone_names, str):
+            zone_names = [zone_names]
+        with tempfile.TemporaryFile() as archive:
+            self.export_zones_to_file(zone_names, archive, chunk_size)
+            archive.seek(0)
+            for zone_name, bind_text in iter_zone_files(archive):
+                yield zone_name or zone_names[0], bind_text
+
+    def export_zones(self, zone_names, chunk_size=100, max_workers=4, output_dir=None):
+        """Exports a large number of zones as concurrent multi-zone export tasks.
+
+        The zone list is split into chunks, each exported as one task. Tasks are
+        submitted and polled together, and zones are yielded as each chunk finishes.
+
+        Arguments:
+        zone_names -- An iterable of zone names.
+
+        Keyword Arguments:
+        chunk_size -- Zones per export task. Defaults to 100.
+        max_workers -- Export tasks in progress at once. Defaults to 4.
+        output_dir -- If given, each zone is written to '<output_dir>/<zone>.txt' and the
+                      path is yielded instead of the bind text.
+
+        Yields:
+        (zone_name, bind_text) tuples, or (zone_name, path) when output_dir is given.
+        """
+        return bulk_export(self, zone_names, chunk_size=chunk_size, max_workers=max_workers, output_dir=output_dir)
+
+    def _start_export(self, zone_names):
+        """Starts a zone export task and waits for it to finish. Returns the task id."""
+        zonejson = json.dumps({'zoneNames': zone_names})
         status = self.rest_api_connection.post("/v3/zones/export", json=zonejson)
         task_id = status.get('task_id')
+        self._wait_for_task(task_id)
+        return task_id
 
+    def _wait_for_task(self, task_id):
+        delays = self.polling.delays()
         while True:
             task_status = self.rest_api_connection.get(f"/v1/tasks/{task_id}")
-            if task_status['code'] != 'IN_PROCESS':
-                break
-            time.sleep(1)
-
-        result = self.rest_api_connection.get(f"/v1/tasks/{task_id}/result")
-        self.clear_task(task_id)
-        return result
+            if task_status.get('code') not in ['PENDING', 'IN_PROCESS']:
+                return task_status
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(f"Task {task_id} did not finish before the polling deadline")
+            time.sleep(delay)
 
     # Health Checks
     def create_health_check(self, zone_name):
@@ -0,0 +1,264 @@
+"""
+Batch utilities for the Ultra REST Client.
+
+This module provides helpers for sending operation lists of any length through
+the /v1/batch endpoint, and for turning ordinary client calls into batches.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from fnmatch import fnmatchcase
+import asyncio
+import json
+import time
+
+
+def bulk_batch(client, operations, chunk_size=100, max_workers=4):
+    """
+    Send any number of batch operations as concurrent /v1/batch requests.
+
+    The operations are split into chunks of `chunk_size`, and up to `max_workers`
+    chunks are in flight at once. Operations that come back with a retryable status
+    (e.g. 429 or 503, per the connection's RetryPolicy) are sent again in a smaller
+    batch after the policy's backoff; operations that were applied are never resent.
+
+    Args:
+        client (RestApiClient): The RestApiClient instance to use for API calls.
+        operations (iterable): Batch operations, each a dict with 'method', 'uri' and
+            optionally 'body', as accepted by RestApiClient.batch.
+        chunk_size (int, optional): Operations per /v1/batch request. Defaults to 100.
+        max_workers (int, optional): Batch requests in flight at once. Defaults to 4.
+
+    Returns:
+        list: One result per operation, in the order of `operations`. Each result is the
+            batch response item ({'status': ..., 'response': ...}) for that operation, or,
+            if its whole chunk was rejected, {'status': None, 'response': <error>}.
+    """
+    operations = list(operations)
+    chunks = [range(start, min(start + chunk_size, len(operations)))
+              for start in range(0, len(operations), chunk_size)]
+    results = [None] * len(operations)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_results in executor.map(lambda chunk: _send_chunk(client, operations, chunk), chunks):
+            for index, result in chunk_results.items():
+                results[index] = result
+    return results
+
+
+async def bulk_batch_async(client, operations, chunk_size=100, max_workers=4):
+    """
+    Async counterpart of bulk_batch, for use with AsyncRestApiClient.
+
+    The chunks are sent as concurrent tasks, at most `max_workers` at a time.
+
+    Returns:
+        list: One result per operation, as for bulk_batch.
+    """
+    operations = list(operations)
+    chunks = [range(start, min(start + chunk_size, len(operations)))
+              for start in range(0, len(operations), chunk_size)]
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def send(chunk):
+        async with semaphore:
+            return await _send_chunk_async(client, operations, chunk)
+
+    results = [None] * len(operations)
+    for chunk_results in await asyncio.gather(*(send(chunk) for chunk in chunks)):
+        for index, result in chunk_results.items():
+            results[index] = result
+    return results
+
+
+def _send_chunk(client, operations, indexes):
+    policy = client.rest_api_connection.retry_policy
+    results = {}
+    pending = list(indexes)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        response = client.batch([operations[index] for index in pending])
+        retry = _record_results(results, pending, response, policy)
+        if not retry:
+            return results
+        delay = policy.get_delay(attempt, started)
+        if delay is None:
+            return results
+        time.sleep(delay)
+        pending = retry
+
+
+async def _send_chunk_async(client, operations, indexes):
+    policy = client.rest_api_connection.retry_policy
+    results = {}
+    pending = list(indexes)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        response = await client.batch([operations[index] for index in pending])
+        retry = _record_results(results, pending, response, policy)
+        if not retry:
+            return results
+        delay = policy.get_delay(attempt, started)
+        if delay is None:
+            return results
+        await asyncio.sleep(delay)
+        pending = retry
+
+
+def _record_results(results, pending, response, policy):
+    """Store the result of each pending operation and return those to send again."""
+    if not isinstance(response, list) or len(response) != len(pending) or \
+            not all(isinstance(item, dict) and 'status' in item for item in response):
+        # the request itself was rejected, so none of these operations ran
+        results.update((index, {'status': None, 'response': response}) for index in pending)
+        return []
+
+    retry = []
+    for index, item in zip(pending, response):
+        results[index] = item
+        if policy.retries_status(_status(item)):
+            retry.append(index)
+    return retry
+
+
+def _status(item):
+    try:
+        return int(item.get('status'))
+    except (TypeError, ValueError):
+        return None
+
+
+class DeferredBatch:
+    """
+    Records the writes made through a client and sends them as batches on exit.
+
+    While the context is active, every RRSet or pool write (a POST/PUT/PATCH/DELETE
+    under /v1/zones/{zone}/rrsets/) the client makes from the same thread is recorded
+    instead of sent, and the client method returns a concurrent.futures.Future for its
+    result. Reads and every other request (tasks, exports, reports, ...) are still
+    sent immediately, since their callers need the response. On a
+    clean exit the recorded writes are sent with bulk_batch(), in the order they
+    were made, and each Future resolves to that write's batch result
+    ({'status': ..., 'response': ...}). If the block raises, nothing is sent and
+    the Futures are cancelled.
+    """
+
+    def __init__(self, client, chunk_size=100, max_workers=1):
+        """
+        Initialize the DeferredBatch.
+
+        Args:
+            client (RestApiClient): The client whose writes are deferred.
+            chunk_size (int, optional): Operations per /v1/batch request. Defaults to 100.
+            max_workers (int, optional): Batch requests in flight at once. Defaults to 1,
+                so batches are applied in the order the writes were made.
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.operations = []
+        self.futures = []
+        self._previous = None
+
+    # Requests that are recorded; anything else is sent straight away
+    DEFERRABLE = ("/v1/zones/*/rrsets/*",)
+
+    def accepts(self, method, uri, files=None):
+        """Return True if the request should be recorded rather than sent."""
+        if method == "GET" or files is not None:
+            return False
+        path = uri.split('?', 1)[0]
+        return any(fnmatchcase(path, pattern) for pattern in self.DEFERRABLE)
+
+    def record(self, method, uri, body=None):
+        """Record a write and return a Future for its result."""
+        operation = {'method': method, 'uri': uri}
+        if body is not None:
+            operation['body'] = json.loads(body) if isinstance(body, (str, bytes)) else body
+        future = self._future()
+        self.operations.append(operation)
+        self.futures.append(future)
+        return future
+
+    def _future(self):
+        return Future()
+
+    def flush(self):
+        """Send the writes recorded so far and resolve their Futures."""
+        operations, futures = self.operations, self.futures
+        self.operations, self.futures = [], []
+        if not operations:
+            return []
+        try:
+            results = bulk_batch(self.client, operations, self.chunk_size, self.max_workers)
+        except BaseException as e:
+            for future in futures:
+                future.set_exception(e)
+            raise
+        for future, result in zip(futures, results):
+            future.set_result(result)
+        return results
+
+    def __enter__(self):
+        local = self.client.rest_api_connection._deferred
+        self._previous = getattr(local, 'batch', None)
+        local.batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.client.rest_api_connection._deferred.batch = self._previous
+        if exc_type is not None:
+            for future in self.futures:
+                future.cancel()
+            self.operations, self.futures = [], []
+            return
+        self.flush()
+
+
+class AsyncDeferredBatch(DeferredBatch):
+    """
+    Async counterpart of DeferredBatch, for use with AsyncRestApiClient.
+
+    Used with `async with`. While the block is active, writes awaited from the same
+    task (or from tasks it starts) are recorded and return an asyncio Future; on a
+    clean exit they are sent with bulk_batch_async() and the Futures resolved.
+    """
+
+    def _future(self):
+        return asyncio.get_running_loop().create_future()
+
+    async def flush(self):
+        """Send the writes recorded so far and resolve their Futures."""
+        operations, futures = self.operations, self.futures
+        self.operations, self.futures = [], []
+        if not operations:
+            return []
+        try:
+            results = await bulk_batch_async(self.client, operations, self.chunk_size, self.max_workers)
+        except BaseException as e:
+            for future in futures:
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            raise
+        for future, result in zip(futures, results):
+            future.set_result(result)
+        return results
+
+    def __enter__(self):
+        raise TypeError("AsyncDeferredBatch must be used with 'async with', not 'with'.")
+
+    async def __aenter__(self):
+        self._previous = self.client.rest_api_connection._deferred.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.client.rest_api_connection._deferred.reset(self._previous)
+        if exc_type is not None:
+            for future in self.futures:
+                future.cancel()
+            self.operations, self.futures = [], []
+            return
+        await self.flush()
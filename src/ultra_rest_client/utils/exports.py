@@ -0,0 +1,313 @@
+"""
+Zone export utilities for the Ultra REST Client.
+
+This module provides helpers for exporting many zones at once and for reading
+zone exports that were streamed to disk, one zone file at a time.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from itertools import islice
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from ..connection import RestError
+
+
+def iter_zone_files(archive, encoding='utf-8'):
+    """
+    Iterate over the zone files in an export archive without loading it all into memory.
+
+    Only one zone file is decompressed at a time. Archives are read from disk (or
+    any seekable binary file object), since the zip index sits at the end of the file.
+
+    Args:
+        archive: A path to the archive, or a seekable binary file object.
+        encoding (str, optional): Encoding of the BIND files. Defaults to 'utf-8'.
+
+    Yields:
+        tuple: (zone_name, bind_text) for each zone in the archive. The zone name is
+            the archive member's file name without any '.txt' or '.zone' extension.
+    """
+    if not zipfile.is_zipfile(archive):
+        # single zone exports come back as plain text rather than a zip
+        yield from _iter_plain_text(archive, encoding)
+        return
+
+    with zipfile.ZipFile(archive) as zip_file:
+        for info in zip_file.infolist():
+            if info.is_dir():
+                continue
+            with zip_file.open(info) as member:
+                yield _zone_name(info.filename), io.TextIOWrapper(member, encoding=encoding).read()
+
+
+def _iter_plain_text(archive, encoding):
+    if isinstance(archive, (str, os.PathLike)):
+        with open(archive, 'r', encoding=encoding) as fileobj:
+            text = fileobj.read()
+    else:
+        archive.seek(0)
+        text = archive.read().decode(encoding)
+    yield _origin_of(text), text
+
+
+def _zone_name(filename):
+    name = os.path.basename(filename)
+    for extension in ('.txt', '.zone'):
+        if name.endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+
+def _origin_of(text):
+    for line in text.splitlines():
+        if line.upper().startswith('$ORIGIN'):
+            parts = line.split()
+            if len(parts) > 1:
+                return parts[1]
+    return None
+
+
+def bulk_export(client, zone_names, chunk_size=100, max_workers=4, output_dir=None):
+    """
+    Export many zones by splitting them into multi-zone export tasks.
+
+    Chunks are submitted concurrently, all outstanding tasks are polled together,
+    and zones are yielded as soon as the chunk containing them has been downloaded.
+    At most `max_workers` export tasks are outstanding at any time. Polls follow the
+    client's PollingStrategy, which restarts whenever a task finishes; if its deadline
+    passes with no task finishing, the outstanding tasks are counted as failed.
+
+    Args:
+        client (RestApiClient): The RestApiClient instance to use for API calls.
+        zone_names (iterable): The zones to export.
+        chunk_size (int, optional): Zones per export task. Defaults to 100.
+        max_workers (int, optional): Export tasks outstanding, polled and downloaded concurrently.
+            Defaults to 4.
+        output_dir (str, optional): If given, each zone is written to '<output_dir>/<zone>.txt'
+            and the path is yielded instead of the zone's text.
+
+    Yields:
+        tuple: (zone_name, bind_text), or (zone_name, path) when output_dir is given.
+
+    Raises:
+        RestError: Once every other chunk has been yielded, if any export task failed.
+
+    If iteration stops early, or a request raises, the export tasks still outstanding
+    are cleared.
+    """
+    chunks = _chunked(zone_names, chunk_size)
+    pending = {}  # task_id -> chunk of zone names
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def fill():
+            while len(pending) < max_workers:
+                batch = list(islice(chunks, max_workers - len(pending)))
+                if not batch:
+                    return
+                submissions = [(chunk, executor.submit(_submit_export, client, chunk)) for chunk in batch]
+                error = None
+                for chunk, submission in submissions:
+                    # record every task that was started before raising, so it can be cleared
+                    try:
+                        status = submission.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    if isinstance(status, dict) and 'task_id' in status:
+                        pending[status['task_id']] = chunk
+                    else:
+                        failures.append({'zoneNames': chunk, 'response': status})
+                if error is not None:
+                    raise error
+
+        try:
+            fill()
+            delays = client.polling.delays()
+            while pending:
+                task_ids = list(pending)
+                statuses = dict(zip(task_ids, executor.map(client.get_task, task_ids)))
+                finished = [task_id for task_id in task_ids
+                            if statuses[task_id].get('code') not in ['PENDING', 'IN_PROCESS']]
+                if not finished:
+                    delay = next(delays, None)
+                    if delay is not None:
+                        time.sleep(delay)
+                        continue
+                    for task_id in task_ids:
+                        statuses[task_id] = {'error': 'Polling deadline reached', 'task_id': task_id}
+                    finished = task_ids
+
+                delays = client.polling.delays()
+                done = {task_id: pending.pop(task_id) for task_id in finished}
+                # keep the server busy with the next chunks while these download
+                fill()
+
+                downloads = []
+                for task_id, chunk in done.items():
+                    if statuses[task_id].get('code') == 'COMPLETE':
+                        downloads.append(executor.submit(_collect_export, client, task_id, chunk, output_dir))
+                    else:
+                        failures.append({'zoneNames': chunk, 'response': statuses[task_id]})
+                        client.clear_task(task_id)
+                for future in as_completed(downloads):
+                    yield from future.result()
+        finally:
+            # the caller stopped early or something failed; don't leave tasks behind
+            for task_id in pending:
+                _clear_quietly(client, task_id)
+
+    if failures:
+        raise RestError({'failedExports': failures})
+
+
+async def bulk_export_async(client, zone_names, chunk_size=100, max_workers=4, output_dir=None):
+    """
+    Async counterpart of bulk_export, for use with AsyncRestApiClient.
+
+    Submissions, polls and downloads are concurrent tasks on the event loop; reading
+    the downloaded archives and writing zone files happen in worker threads.
+
+    Yields:
+        tuple: (zone_name, bind_text), or (zone_name, path) when output_dir is given
+            (async generator).
+
+    Raises:
+        RestError: As for bulk_export.
+    """
+    chunks = _chunked(zone_names, chunk_size)
+    pending = {}  # task_id -> chunk of zone names
+    failures = []
+
+    async def fill():
+        while len(pending) < max_workers:
+            batch = list(islice(chunks, max_workers - len(pending)))
+            if not batch:
+                return
+            statuses = await asyncio.gather(*(_submit_export(client, chunk) for chunk in batch), return_exceptions=True)
+            error = None
+            for chunk, status in zip(batch, statuses):
+                # record every task that was started before raising, so it can be cleared
+                if isinstance(status, BaseException):
+                    error = error or status
+                elif isinstance(status, dict) and 'task_id' in status:
+                    pending[status['task_id']] = chunk
+                else:
+                    failures.append({'zoneNames': chunk, 'response': status})
+            if error is not None:
+                raise error
+
+    downloads = []
+    try:
+        await fill()
+        delays = client.polling.delays()
+        while pending:
+            task_ids = list(pending)
+            statuses = dict(zip(task_ids, await asyncio.gather(*(client.get_task(task_id) for task_id in task_ids))))
+            finished = [task_id for task_id in task_ids
+                        if statuses[task_id].get('code') not in ['PENDING', 'IN_PROCESS']]
+            if not finished:
+                delay = next(delays, None)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+                for task_id in task_ids:
+                    statuses[task_id] = {'error': 'Polling deadline reached', 'task_id': task_id}
+                finished = task_ids
+
+            delays = client.polling.delays()
+            done = {task_id: pending.pop(task_id) for task_id in finished}
+            # keep the server busy with the next chunks while these download
+            await fill()
+
+            downloads = []
+            for task_id, chunk in done.items():
+                if statuses[task_id].get('code') == 'COMPLETE':
+                    downloads.append(asyncio.ensure_future(_collect_export_async(client, task_id, chunk, output_dir)))
+                else:
+                    failures.append({'zoneNames': chunk, 'response': statuses[task_id]})
+                    await client.clear_task(task_id)
+            for download in asyncio.as_completed(downloads):
+                for result in await download:
+                    yield result
+            downloads = []
+    finally:
+        # the caller stopped early or something failed; don't leave tasks behind
+        for download in downloads:
+            download.cancel()
+        # cancelled downloads clear their own tasks
+        await asyncio.gather(*downloads, return_exceptions=True)
+        for task_id in pending:
+            await _clear_quietly_async(client, task_id)
+
+    if failures:
+        raise RestError({'failedExports': failures})
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _submit_export(client, zone_names):
+    return client.rest_api_connection.post("/v3/zones/export", json=json.dumps({'zoneNames': zone_names}))
+
+
+def _collect_export(client, task_id, zone_names, output_dir):
+    """Download one finished export task and return its zones, matched back to the requested names."""
+    try:
+        with tempfile.TemporaryFile() as archive:
+            client.rest_api_connection.download(f"/v1/tasks/{task_id}/result", archive)
+            return _read_export(archive, zone_names, output_dir)
+    finally:
+        _clear_quietly(client, task_id)
+
+
+def _read_export(archive, zone_names, output_dir):
+    requested = {name.rstrip('.').lower(): name for name in zone_names}
+    results = []
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    archive.seek(0)
+    for zone_name, bind_text in iter_zone_files(archive):
+        zone_name = requested.get((zone_name or zone_names[0]).rstrip('.').lower(), zone_name)
+        if output_dir is not None:
+            path = os.path.join(output_dir, f"{zone_name.rstrip('.')}.txt")
+            with open(path, 'w', encoding='utf-8') as fileobj:
+                fileobj.write(bind_text)
+            results.append((zone_name, path))
+        else:
+            results.append((zone_name, bind_text))
+    return results
+
+
+async def _collect_export_async(client, task_id, zone_names, output_dir):
+    try:
+        with tempfile.TemporaryFile() as archive:
+            await client.rest_api_connection.download(f"/v1/tasks/{task_id}/result", archive)
+            return await asyncio.to_thread(_read_export, archive, zone_names, output_dir)
+    finally:
+        await _clear_quietly_async(client, task_id)
+
+
+def _clear_quietly(client, task_id):
+    """Clear a task during cleanup, without masking the error being handled."""
+    try:
+        client.clear_task(task_id)
+    except Exception:
+        pass
+
+
+async def _clear_quietly_async(client, task_id):
+    try:
+        await client.clear_task(task_id)
+    except Exception:
+        pass
@@ -0,0 +1,202 @@
+"""
+Bulk import utilities for the Ultra REST Client.
+
+This module creates RRSets from CSV or JSON Lines files, reading the input lazily
+and sending the records through concurrent /v1/batch requests.
+"""
+import asyncio
+import csv
+import json
+import os
+from .batching import bulk_batch, bulk_batch_async, _status
+from .reconcile import _absolute
+
+# Accepted column names for each field, first match wins
+_COLUMNS = {
+    'zone': ('zone', 'zoneName', 'zone_name'),
+    'owner': ('owner', 'ownerName', 'owner_name', 'name'),
+    'type': ('type', 'rrtype', 'rtype'),
+    'ttl': ('ttl',),
+    'rdata': ('rdata', 'value', 'data')
+}
+
+
+def import_rrsets(client, source, fmt=None, zone_name=None, window=10000, chunk_size=100, max_workers=4, progress=None, encoding='utf-8'):
+    """
+    Create RRSets from a CSV or JSON Lines file.
+
+    Each row is one record with zone, owner, type, ttl and rdata fields (the zone may
+    instead be given as `zone_name`). Rows are read `window` at a time; within a
+    window, rows with the same zone, type and owner are merged into one RRSet, and
+    the window's RRSets are created with bulk_batch() before the next rows are read.
+    Rows of one RRSet should therefore be within `window` rows of each other, as in
+    any file sorted or grouped by owner; a row for an RRSet that was already sent is
+    reported as an error rather than merged. Owner names are made absolute and
+    lower-case relative to the zone, so 'www' and 'WWW.example.com.' are the same RRSet.
+
+    Args:
+        client (RestApiClient): The RestApiClient instance to use for API calls.
+        source: A path to the file, or an open text file.
+        fmt (str, optional): 'csv' or 'jsonl'. Defaults to None (taken from the file extension).
+        zone_name (str, optional): The zone for rows without a zone field. Defaults to None.
+        window (int, optional): Rows grouped and sent together. Defaults to 10000.
+        chunk_size (int, optional): Operations per /v1/batch request. Defaults to 100.
+        max_workers (int, optional): Batch requests in flight at once. Defaults to 4.
+        progress (callable, optional): Called with the running totals after each window.
+        encoding (str, optional): Encoding used when `source` is a path. Defaults to 'utf-8'.
+
+    Returns:
+        dict: Totals ('rows', 'rrsets', 'created', 'failed') and 'errors', a list with one
+            {'row', 'zone', 'owner', 'type', 'error'} entry per row that was not imported.
+            Row numbers count data rows from 1.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding=encoding, newline='') as fileobj:
+            return import_rrsets(client, fileobj, fmt or _format_of(source), zone_name, window, chunk_size, max_workers, progress)
+
+    report = _new_report()
+    for keys, operations in _windows(report, source, fmt, zone_name, window):
+        results = bulk_batch(client, operations, chunk_size, max_workers) if operations else []
+        _record(report, keys, results, progress)
+    return report
+
+
+async def import_rrsets_async(client, source, fmt=None, zone_name=None, window=10000, chunk_size=100, max_workers=4, progress=None, encoding='utf-8'):
+    """
+    Async counterpart of import_rrsets, for use with AsyncRestApiClient.
+
+    Each window of rows is read in a worker thread, so the event loop isn't blocked
+    while the file is parsed, and its RRSets are created with bulk_batch_async().
+
+    Returns:
+        dict: The same report as import_rrsets.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding=encoding, newline='') as fileobj:
+            return await import_rrsets_async(client, fileobj, fmt or _format_of(source), zone_name, window, chunk_size, max_workers, progress)
+
+    report = _new_report()
+    windows = _windows(report, source, fmt, zone_name, window)
+    while True:
+        batch = await asyncio.to_thread(next, windows, None)
+        if batch is None:
+            return report
+        keys, operations = batch
+        results = await bulk_batch_async(client, operations, chunk_size, max_workers) if operations else []
+        _record(report, keys, results, progress)
+
+
+def _format_of(path):
+    return 'csv' if os.fspath(path).lower().endswith('.csv') else 'jsonl'
+
+
+def _new_report():
+    return {'rows': 0, 'rrsets': 0, 'created': 0, 'failed': 0, 'errors': []}
+
+
+def _windows(report, source, fmt, zone_name, window):
+    """
+    Read the rows `window` at a time, yielding (keys, operations) for each window.
+
+    keys pairs each operation with its RRSet key and the row numbers merged into it.
+    """
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError("fmt must be 'csv' or 'jsonl'")
+    rows = csv.DictReader(source) if fmt == 'csv' else _json_lines(source)
+    submitted = set()
+    pending = {}  # (zone, type, owner) -> {'ttl', 'rdata', 'rows'}
+    for number, row in enumerate(rows, 1):
+        report['rows'] += 1
+        _add_row(report, pending, submitted, number, row, zone_name)
+        if report['rows'] % window == 0:
+            yield _take(pending, submitted)
+    if report['rows'] % window or not report['rows']:
+        yield _take(pending, submitted)
+
+
+def _json_lines(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def _add_row(report, pending, submitted, number, row, zone_name):
+    fields = {}
+    try:
+        if isinstance(row, Exception):
+            raise ValueError(f"invalid JSON: {row}")
+        if not isinstance(row, dict):
+            raise ValueError("each line must be a JSON object")
+        fields = {name: _field(row, name) for name in _COLUMNS}
+        zone = fields['zone'] or zone_name
+        if not zone or not fields['owner'] or not fields['type'] or fields['rdata'] in (None, '', []):
+            raise ValueError("zone, owner, type and rdata are required")
+        ttl = int(fields['ttl'])
+        rdata = fields['rdata'] if isinstance(fields['rdata'], list) else [fields['rdata']]
+    except (TypeError, ValueError) as e:
+        _row_error(report, number, fields, zone_name, str(e))
+        return
+
+    zone = _absolute(str(zone), '')
+    key = (zone, str(fields['type']).upper(), _absolute(str(fields['owner']), zone))
+    if key in submitted:
+        _row_error(report, number, fields, zone_name, "RRSet was already sent with an earlier window; group its rows together")
+        return
+    rrset = pending.setdefault(key, {'ttl': ttl, 'rdata': [], 'rows': []})
+    if rrset['ttl'] != ttl:
+        _row_error(report, number, fields, zone_name, f"TTL {ttl} differs from the RRSet's TTL {rrset['ttl']}")
+        return
+    rrset['rdata'].extend(value for value in rdata if value not in rrset['rdata'])
+    rrset['rows'].append(number)
+
+
+def _field(row, name):
+    for column in _COLUMNS[name]:
+        value = row.get(column)
+        if value not in (None, ''):
+            return value.strip() if isinstance(value, str) else value
+    return None
+
+
+def _row_error(report, number, fields, zone_name, error):
+    report['failed'] += 1
+    report['errors'].append({
+        'row': number,
+        'zone': fields.get('zone') or zone_name,
+        'owner': fields.get('owner'),
+        'type': fields.get('type'),
+        'error': error
+    })
+
+
+def _take(pending, submitted):
+    keys = []
+    operations = []
+    for (zone, rtype, owner), rrset in pending.items():
+        keys.append(((zone, rtype, owner), rrset['rows']))
+        operations.append({
+            'method': 'POST',
+            'uri': f"/v1/zones/{zone}/rrsets/{rtype}/{owner}",
+            'body': {'ttl': rrset['ttl'], 'rdata': rrset['rdata']}
+        })
+    submitted.update(pending)
+    pending.clear()
+    return keys, operations
+
+
+def _record(report, keys, results, progress):
+    for (key, rows), result in zip(keys, results):
+        report['rrsets'] += 1
+        status = _status(result)
+        if status is not None and 200 <= status < 300:
+            report['created'] += len(rows)
+        else:
+            for number in rows:
+                _row_error(report, number, dict(zip(('zone', 'type', 'owner'), key)), None, result.get('response'))
+    if progress is not None:
+        progress({name: report[name] for name in ('rows', 'rrsets', 'created', 'failed')})
@@ -0,0 +1,222 @@
+"""
+Pagination utilities for the Ultra REST Client.
+
+This module provides iterators that walk paged list endpoints lazily, so callers
+can process very large result sets one item at a time.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from ..connection import RestError
+
+
+def iter_cursor_pages(fetch_page, items_key, prefetch=True):
+    """
+    Iterate over the items of a cursor-paginated endpoint (e.g. /v3/zones).
+
+    Args:
+        fetch_page (callable): Takes a cursor (None for the first page) and returns the page.
+        items_key (str): The key of the item list in each page, e.g. 'zones'.
+        prefetch (bool, optional): Fetch the next page in a background thread while the
+            caller processes the current one. Defaults to True.
+
+    Yields:
+        Each item of each page, in order.
+
+    Raises:
+        RestError: If a page comes back as an error.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = fetch_page(None)
+        while True:
+            items = page_items(page, items_key)
+            cursor = next_cursor(page) if items else None
+            upcoming = None
+            if cursor is not None and executor is not None:
+                upcoming = executor.submit(fetch_page, cursor)
+
+            yield from items
+
+            if cursor is None:
+                return
+            page = upcoming.result() if upcoming is not None else fetch_page(cursor)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def next_cursor(page):
+    """Return the cursor of the page after this one, or None on the last page."""
+    cursor_info = page.get('cursorInfo') or {}
+    return cursor_info.get('next') or None
+
+
+def iter_offset_pages(fetch_page, items_key, page_size=500, max_workers=4, ordered=True):
+    """
+    Iterate over the items of an offset/limit paginated endpoint, fetching pages in parallel.
+
+    The first page is fetched on its own to learn resultInfo.totalCount and how many
+    items the server actually returns per page (it may cap `page_size`); the remaining
+    pages are then fetched concurrently by up to `max_workers` threads. No more than
+    2 * max_workers pages are buffered at once.
+
+    Args:
+        fetch_page (callable): Takes (offset, limit) and returns the page.
+        items_key (str): The key of the item list in each page, e.g. 'rrSets'.
+        page_size (int, optional): Items requested per page. Defaults to 500.
+        max_workers (int, optional): Pages fetched concurrently. Defaults to 4.
+        ordered (bool, optional): Yield items in list order. If False, pages are yielded
+            as soon as they arrive, which keeps every worker busy. Defaults to True.
+
+    Yields:
+        Each item of each page.
+
+    Raises:
+        RestError: If a page comes back as an error, the first page has no totalCount,
+            or a page other than the last comes back short, since items would otherwise
+            be skipped silently.
+    """
+    first = fetch_page(0, page_size)
+    items = page_items(first, items_key)
+    yield from items
+    if not items:
+        return
+
+    total, stride = page_layout(first, items)
+    offsets = iter(range(stride, total, stride))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        in_flight = deque()
+
+        def submit_more():
+            while len(in_flight) < 2 * max_workers:
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                in_flight.append((offset, executor.submit(fetch_page, offset, stride)))
+
+        submit_more()
+        while in_flight:
+            if ordered:
+                offset, future = in_flight.popleft()
+            else:
+                done, _ = wait([future for _, future in in_flight], return_when=FIRST_COMPLETED)
+                offset, future = next(entry for entry in in_flight if entry[1] in done)
+                in_flight.remove((offset, future))
+            items = check_page(future.result(), items_key, offset, stride, total)
+            submit_more()
+            yield from items
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iter_offset_pages_async(fetch_page, items_key, page_size=500, max_workers=4, ordered=True):
+    """
+    Async counterpart of iter_offset_pages, for use with AsyncRestApiClient.
+
+    Args:
+        fetch_page (callable): Takes (offset, limit) and returns an awaitable of the page.
+        items_key (str): The key of the item list in each page, e.g. 'rrSets'.
+        page_size (int, optional): Items requested per page. Defaults to 500.
+        max_workers (int, optional): Pages fetched concurrently. Defaults to 4.
+        ordered (bool, optional): Yield items in list order. Defaults to True.
+
+    Yields:
+        Each item of each page (async generator).
+
+    Raises:
+        RestError: As for iter_offset_pages.
+    """
+    first = await fetch_page(0, page_size)
+    items = page_items(first, items_key)
+    for item in items:
+        yield item
+    if not items:
+        return
+
+    total, stride = page_layout(first, items)
+    offsets = iter(range(stride, total, stride))
+    semaphore = asyncio.Semaphore(max_workers)
+    in_flight = deque()
+
+    async def fetch(offset):
+        async with semaphore:
+            return await fetch_page(offset, stride)
+
+    def submit_more():
+        while len(in_flight) < 2 * max_workers:
+            offset = next(offsets, None)
+            if offset is None:
+                return
+            in_flight.append((offset, asyncio.ensure_future(fetch(offset))))
+
+    try:
+        submit_more()
+        while in_flight:
+            if ordered:
+                offset, task = in_flight.popleft()
+                page = await task
+            else:
+                done, _ = await asyncio.wait([task for _, task in in_flight], return_when=asyncio.FIRST_COMPLETED)
+                offset, task = next(entry for entry in in_flight if entry[1] in done)
+                in_flight.remove((offset, task))
+                page = task.result()
+            items = check_page(page, items_key, offset, stride, total)
+            submit_more()
+            for item in items:
+                yield item
+    finally:
+        for _, task in in_flight:
+            task.cancel()
+
+
+def page_layout(first, items):
+    """
+    Return (totalCount, stride) for an offset-paginated listing from its first page.
+
+    The stride is the number of items the server returned, which is less than the
+    requested limit when the server caps it.
+
+    Raises:
+        RestError: If the page has no resultInfo.totalCount.
+    """
+    total = (first.get('resultInfo') or {}).get('totalCount')
+    if total is None:
+        raise RestError({'error': 'Paged response has no resultInfo.totalCount', 'resultInfo': first.get('resultInfo')})
+    return total, len(items)
+
+
+def check_page(page, items_key, offset, stride, total):
+    """
+    Return the items of the page at `offset`, checking it is complete.
+
+    Raises:
+        RestError: If the page is an error response, or has fewer items than expected.
+    """
+    items = page_items(page, items_key)
+    expected = min(stride, total - offset)
+    if len(items) < expected:
+        raise RestError({
+            'error': f"Page at offset {offset} returned {len(items)} of {expected} expected items",
+            'resultInfo': page.get('resultInfo') if isinstance(page, dict) else None
+        })
+    return items
+
+
+def page_items(page, items_key):
+    """
+    Return the item list of a page.
+
+    The API answers an empty listing with errorCode 70002 (data not found), which
+    is treated as a page with no items; any other response without the list raises.
+
+    Raises:
+        RestError: If the page is an error response.
+    """
+    errors = page if isinstance(page, list) else [page]
+    if any(isinstance(error, dict) and error.get('errorCode') == 70002 for error in errors):
+        return []
+    if not isinstance(page, dict) or items_key not in page:
+        raise RestError(page)
+    return page[items_key]
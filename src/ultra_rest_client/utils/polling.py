@@ -0,0 +1,105 @@
+"""
+Polling utilities for the Ultra REST Client.
+
+This module provides the schedule used to poll background tasks and reports,
+so short jobs are picked up quickly while long ones are polled rarely.
+"""
+import asyncio
+import random
+import time
+
+
+class PollingStrategy:
+    """
+    A polling schedule: an initial delay that grows geometrically up to a cap, with
+    random jitter so many pollers don't fire in lockstep, and an optional deadline.
+
+    With the defaults, the first checks come after about 0.25s, 0.4s and 0.6s, so a
+    task that finishes in under a second is seen almost immediately, while a task
+    that runs for minutes is checked only every 10 seconds.
+    """
+
+    def __init__(self, initial=0.25, growth=1.5, max_interval=10, jitter=0.1, deadline=None):
+        """
+        Initialize the PollingStrategy.
+
+        Args:
+            initial (float, optional): Seconds before the second poll. Defaults to 0.25.
+            growth (float, optional): Factor applied to the delay after each poll. Defaults to 1.5.
+            max_interval (float, optional): The delay never grows beyond this many seconds.
+                Defaults to 10.
+            jitter (float, optional): Each delay is randomised by up to this fraction either way.
+                Defaults to 0.1.
+            deadline (float, optional): Seconds after which polling stops. Defaults to None (no limit).
+        """
+        self.initial = initial
+        self.growth = growth
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+
+    @classmethod
+    def fixed(cls, interval, deadline=None):
+        """Return a strategy that waits the same interval between every poll."""
+        return cls(initial=interval, growth=1, max_interval=interval, jitter=0, deadline=deadline)
+
+    def delays(self):
+        """
+        Yield the delay to sleep before each successive poll.
+
+        The generator stops once the deadline has passed; the last delay is cut short
+        so the final poll happens at the deadline.
+        """
+        started = time.monotonic()
+        interval = self.initial
+        while True:
+            delay = interval * (1 + random.uniform(-self.jitter, self.jitter))
+            if self.deadline is not None:
+                remaining = started + self.deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                delay = min(delay, remaining)
+            yield delay
+            interval = min(self.max_interval, interval * self.growth)
+
+    def wait_for(self, check, on_deadline=None):
+        """
+        Call check() on this schedule until it reports that it has finished.
+
+        Args:
+            check (callable): Polls once; returns (finished, result).
+            on_deadline (optional): Returned if the deadline passes first. Defaults to None.
+
+        Returns:
+            The result of the final check, or `on_deadline`.
+        """
+        delays = self.delays()
+        while True:
+            finished, result = check()
+            if finished:
+                return result
+            delay = next(delays, None)
+            if delay is None:
+                return on_deadline
+            time.sleep(delay)
+
+    async def wait_for_async(self, check, on_deadline=None):
+        """
+        Await check() on this schedule until it reports that it has finished.
+
+        Args:
+            check (callable): Returns an awaitable of (finished, result).
+            on_deadline (optional): Returned if the deadline passes first. Defaults to None.
+
+        Returns:
+            The result of the final check, or `on_deadline`.
+        """
+        delays = self.delays()
+        while True:
+            finished, result = await check()
+            if finished:
+                return result
+            delay = next(delays, None)
+            if delay is None:
+                return on_deadline
+            await asyncio.sleep(delay)
@@ -0,0 +1,219 @@
+"""
+Zone reconciliation utilities for the Ultra REST Client.
+
+This module compares a desired set of RRSets with the live contents of a zone and
+applies the smallest set of creates, edits and deletes that makes them match.
+"""
+import json
+from .batching import bulk_batch, bulk_batch_async
+
+
+class ZonePlan:
+    """
+    The changes needed to bring a zone to its desired state.
+
+    Each list holds RRSets in the normalised form {'ownerName', 'rrtype', 'ttl', 'rdata'}
+    (plus 'profile' for pools), with absolute owner names and bare type names.
+
+    Attributes:
+        create (list): RRSets missing from the zone.
+        patch (list): RRSets whose rdata alone changed; sent as PATCH with the new rdata.
+        update (list): RRSets whose TTL or profile changed; sent as PUT.
+        delete (list): RRSets in the zone that aren't desired.
+        unchanged (int): The number of RRSets already in the desired state.
+    """
+
+    def __init__(self, zone_name):
+        self.zone_name = zone_name
+        self.create = []
+        self.patch = []
+        self.update = []
+        self.delete = []
+        self.unchanged = 0
+
+    def __len__(self):
+        return len(self.create) + len(self.patch) + len(self.update) + len(self.delete)
+
+    def summary(self):
+        """Return the number of RRSets in each part of the plan."""
+        return {
+            'create': len(self.create),
+            'patch': len(self.patch),
+            'update': len(self.update),
+            'delete': len(self.delete),
+            'unchanged': self.unchanged
+        }
+
+    def phases(self):
+        """
+        Return the plan as lists of batch operations, in the order they must be applied.
+
+        Deletes go first so that, for example, an A record can be replaced by a CNAME
+        at the same owner name.
+        """
+        return [
+            [self._operation("DELETE", rrset) for rrset in self.delete],
+            [self._operation("PATCH", rrset, {'rdata': rrset['rdata']}) for rrset in self.patch] +
+            [self._operation("PUT", rrset, _body(rrset)) for rrset in self.update],
+            [self._operation("POST", rrset, _body(rrset)) for rrset in self.create]
+        ]
+
+    def operations(self):
+        """Return every batch operation of the plan, in the order they are applied."""
+        return [operation for phase in self.phases() for operation in phase]
+
+    def _operation(self, method, rrset, body=None):
+        operation = {'method': method, 'uri': f"/v1/zones/{self.zone_name}/rrsets/{rrset['rrtype']}/{rrset['ownerName']}"}
+        if body is not None:
+            operation['body'] = body
+        return operation
+
+
+def plan_zone(zone_name, current_rrsets, desired_rrsets, manage_apex=False, keep_pools=True):
+    """
+    Compute the changes that turn the current RRSets of a zone into the desired ones.
+
+    RRSets are matched by (owner name, type) and compared by a fingerprint of their TTL,
+    rdata and profile, using dict lookups only, so the cost grows linearly with the zone.
+    The order of rdata values is ignored, except in pools, where it can be significant.
+
+    A desired RRSet without a profile (e.g. one read from a zone file, which can't
+    describe pools) doesn't turn a live pool into a plain RRSet unless keep_pools is
+    False: the pool's profile is kept, only a change in its set of rdata values is
+    patched, and a TTL change is sent with the pool's own profile and rdata order.
+
+    Args:
+        zone_name (str): The zone being reconciled.
+        current_rrsets (iterable): The zone's RRSets as returned by get_rrsets.
+        desired_rrsets (iterable): The RRSets the zone should contain, as dicts with
+            'ownerName', 'rrtype', 'ttl', 'rdata' and optionally 'profile'. Owner names
+            may be relative to the zone or '@', and rdata may be a single string.
+        manage_apex (bool, optional): Include the SOA and apex NS records, which are
+            otherwise left alone. Defaults to False.
+        keep_pools (bool, optional): Keep the profile of live pools whose desired RRSet
+            has none. Defaults to True.
+
+    Returns:
+        ZonePlan: The changes to apply.
+    """
+    zone = _absolute(zone_name, '')
+    current = _index(zone, current_rrsets, manage_apex)
+    desired = _index(zone, desired_rrsets, manage_apex)
+
+    plan = ZonePlan(zone_name)
+    for key, (fingerprint, rrset) in desired.items():
+        existing = current.pop(key, None)
+        if existing is None:
+            plan.create.append(rrset)
+        elif keep_pools and fingerprint[2] is None and existing[0][2] is not None:
+            _plan_pool(plan, existing[1], rrset)
+        elif existing[0] == fingerprint:
+            plan.unchanged += 1
+        elif existing[0][1:] == fingerprint[1:] and fingerprint[2] is None:
+            # same TTL and neither is a pool, so only the rdata differs
+            plan.patch.append(rrset)
+        else:
+            plan.update.append(rrset)
+    plan.delete.extend(rrset for _, rrset in current.values())
+    return plan
+
+
+def reconcile_zone(client, zone_name, desired_rrsets, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4, keep_pools=True):
+    """
+    Bring a zone to its desired state with the fewest changes.
+
+    The zone's RRSets are read with RestApiClient.iter_rrsets, compared with the desired
+    RRSets by plan_zone(), and the resulting plan is applied with bulk_batch(), one phase
+    (deletes, edits, creates) at a time.
+
+    Args:
+        client (RestApiClient): The RestApiClient instance to use for API calls.
+        zone_name (str): The zone to reconcile.
+        desired_rrsets (iterable): The RRSets the zone should contain (see plan_zone).
+        dry_run (bool, optional): Compute the plan without applying it. Defaults to False.
+        manage_apex (bool, optional): Include the SOA and apex NS records. Defaults to False.
+        chunk_size (int, optional): Operations per /v1/batch request. Defaults to 100.
+        max_workers (int, optional): Batch requests in flight at once. Defaults to 4.
+        keep_pools (bool, optional): Keep the profile of live pools whose desired RRSet
+            has none (see plan_zone). Defaults to True.
+
+    Returns:
+        tuple: (plan, results), where results holds one batch result per operation of
+            plan.operations(), in the same order (empty on a dry run).
+    """
+    plan = plan_zone(zone_name, client.iter_rrsets(zone_name), desired_rrsets, manage_apex, keep_pools)
+    results = []
+    if not dry_run:
+        for operations in plan.phases():
+            if operations:
+                results.extend(bulk_batch(client, operations, chunk_size, max_workers))
+    return plan, results
+
+
+async def reconcile_zone_async(client, zone_name, desired_rrsets, dry_run=False, manage_apex=False, chunk_size=100, max_workers=4, keep_pools=True):
+    """
+    Async counterpart of reconcile_zone, for use with AsyncRestApiClient.
+
+    Returns:
+        tuple: (plan, results), as for reconcile_zone.
+    """
+    current = await client.fetch_all_rrsets(zone_name)
+    plan = plan_zone(zone_name, current, desired_rrsets, manage_apex, keep_pools)
+    results = []
+    if not dry_run:
+        for operations in plan.phases():
+            if operations:
+                results.extend(await bulk_batch_async(client, operations, chunk_size, max_workers))
+    return plan, results
+
+
+def _plan_pool(plan, pool, rrset):
+    """Plan a live pool against a desired RRSet that has no profile, keeping the pool."""
+    if sorted(pool['rdata']) != sorted(rrset['rdata']):
+        plan.patch.append(rrset)
+    elif pool['ttl'] != rrset['ttl']:
+        plan.update.append(dict(pool, ttl=rrset['ttl']))
+    else:
+        plan.unchanged += 1
+
+
+def _index(zone, rrsets, manage_apex):
+    index = {}
+    for rrset in rrsets:
+        rrset = _normalise(zone, rrset)
+        if not manage_apex and (rrset['rrtype'] == 'SOA' or (rrset['rrtype'] == 'NS' and rrset['ownerName'] == zone)):
+            continue
+        profile = rrset.get('profile')
+        rdata = tuple(rrset['rdata']) if profile else tuple(sorted(rrset['rdata']))
+        fingerprint = (rdata, rrset['ttl'], json.dumps(profile, sort_keys=True) if profile else None)
+        index[(rrset['ownerName'], rrset['rrtype'])] = (fingerprint, rrset)
+    return index
+
+
+def _normalise(zone, rrset):
+    rdata = rrset['rdata']
+    normalised = {
+        'ownerName': _absolute(rrset['ownerName'], zone),
+        'rrtype': rrset['rrtype'].split(' ', 1)[0].upper(),
+        'ttl': int(rrset['ttl']),
+        'rdata': [' '.join(value.split()) for value in ([rdata] if isinstance(rdata, str) else rdata)]
+    }
+    if rrset.get('profile'):
+        normalised['profile'] = rrset['profile']
+    return normalised
+
+
+def _absolute(name, zone):
+    name = name.strip().lower()
+    if name in ('@', ''):
+        return zone
+    if name.endswith('.'):
+        return name
+    return f"{name}.{zone}" if zone else f"{name}."
+
+
+def _body(rrset):
+    body = {'ttl': rrset['ttl'], 'rdata': rrset['rdata']}
+    if 'profile' in rrset:
+        body['profile'] = rrset['profile']
+    return body
@@ -3,7 +3,9 @@ Report handling utilities for the Ultra REST Client.
 
 This module provides utilities for handling report responses from the UltraDNS API.
 """
-import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from .scheduler import default_scheduler
+from .tasks import _polling_strategy
 
 
 class ReportHandler:
@@ -14,18 +16,20 @@ class ReportHandler:
     the appropriate endpoint until the report is complete.
     """
     
-    def __init__(self, response, client, poll_interval=1, max_retries=None):
+    def __init__(self, response, client, poll_interval=None, max_retries=None, polling=None):
         """
         Initialize the ReportHandler with an API response.
         
         Args:
             response: The API response to process.
             client (RestApiClient): The RestApiClient instance to use for API calls.
-            poll_interval (int, optional): The interval in seconds between polling attempts.
-                Defaults to 1.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+                Defaults to None (use `polling`).
             max_retries (int, optional): The maximum number of polling attempts.
                 If None, will poll indefinitely until the report is complete.
                 Defaults to None.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's
+                strategy, which starts fast and backs off for long-running reports.
         
         Returns:
             The final result of the report polling, or the original response
@@ -33,6 +37,7 @@ class ReportHandler:
         """
         self.client = client
         self.poll_interval = poll_interval
+        self.polling = _polling_strategy(client, poll_interval, polling)
         self.max_retries = max_retries
         
         # Process the response
@@ -53,6 +58,107 @@ class ReportHandler:
         
         return response
     
+    @classmethod
+    def submit(cls, response, client, poll_interval=None, max_retries=None, polling=None, scheduler=None):
+        """
+        Start handling a report response without blocking.
+        
+        The report is polled by a shared background PollScheduler, so a single
+        process can follow thousands of reports. This needs the blocking
+        RestApiClient; with AsyncRestApiClient, use wait_async() instead.
+        
+        Args:
+            response: The API response to process.
+            client (RestApiClient): The RestApiClient instance to use for API calls.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+            max_retries (int, optional): The maximum number of polling attempts. Defaults to None.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's.
+            scheduler (PollScheduler, optional): Defaults to the process-wide scheduler.
+        
+        Returns:
+            Future: Resolves to the same result the blocking ReportHandler would produce.
+        """
+        handler = cls(None, client, poll_interval, max_retries, polling)
+        if isinstance(response, dict) and 'requestId' in response:
+            request_id = response['requestId']
+            return (scheduler or default_scheduler()).schedule(
+                handler._report_check(request_id), handler.polling.delays(), _deadline_error(request_id))
+        future = Future()
+        future.set_result(response)
+        return future
+    
+    @classmethod
+    def as_completed(cls, client, requests, max_workers=4, poll_interval=None, max_retries=None, polling=None, scheduler=None):
+        """
+        Request many reports concurrently and yield each result as soon as it is ready.
+        
+        Each request is a callable that starts one report and returns its response,
+        e.g. `lambda: client.create_zone_query_volume_report(start, end)`. Up to
+        `max_workers` requests are sent at a time through the client's connection, so
+        its RateLimiter and RetryPolicy pace them. Every requestId is then polled by
+        a shared PollScheduler rather than a loop per report.
+        
+        Args:
+            client (RestApiClient): The RestApiClient instance to use for API calls.
+            requests: A dict of key -> callable, or an iterable of callables (keyed by position).
+            max_workers (int, optional): Report requests sent at the same time. Defaults to 4.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+            max_retries (int, optional): The maximum number of polling attempts per report.
+                Defaults to None.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's.
+            scheduler (PollScheduler, optional): Defaults to the process-wide scheduler.
+        
+        Yields:
+            tuple: (key, result) in completion order. If starting or polling a report
+                fails, the result is {'error': message} instead.
+        """
+        if not hasattr(requests, 'items'):
+            requests = dict(enumerate(requests))
+        scheduler = scheduler or default_scheduler()
+        pending = {}  # future -> (key, started)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for key, request in requests.items():
+                    pending[executor.submit(request)] = (key, False)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, started = pending.pop(future)
+                        if future.exception() is not None:
+                            yield key, {'error': str(future.exception())}
+                        elif started:
+                            yield key, future.result()
+                        else:
+                            polled = cls.submit(future.result(), client, poll_interval, max_retries, polling, scheduler)
+                            pending[polled] = (key, True)
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    @classmethod
+    async def wait_async(cls, response, client, poll_interval=None, max_retries=None, polling=None):
+        """
+        Handle a report response from an AsyncRestApiClient call, without blocking the event loop.
+        
+        Polls with asyncio.sleep between the requests, so any number of reports can be
+        awaited concurrently, e.g. with asyncio.gather.
+        
+        Args:
+            response: The API response to process.
+            client (AsyncRestApiClient): The async client to use for API calls.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+            max_retries (int, optional): The maximum number of polling attempts. Defaults to None.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's.
+        
+        Returns:
+            The same result the blocking ReportHandler would produce.
+        """
+        handler = cls(None, client, poll_interval, max_retries, polling)
+        if isinstance(response, dict) and 'requestId' in response:
+            request_id = response['requestId']
+            return await handler.polling.wait_for_async(handler._report_check_async(request_id), _deadline_error(request_id))
+        return response
+    
     def _handle_report(self, request_id):
         """
         Handle a response containing a requestId.
@@ -65,37 +171,58 @@ class ReportHandler:
         Returns:
             The final report result.
         """
+        return self.polling.wait_for(self._report_check(request_id), _deadline_error(request_id))
+    
+    def _report_check(self, request_id):
+        """
+        Return a callable that polls the report once and returns (finished, result).
+        
+        The callable gives up with an error once max_retries polls have found the
+        report still processing.
+        """
         retry_count = 0
         
-        while True:
+        def check():
+            nonlocal retry_count
             if self.max_retries is not None and retry_count >= self.max_retries:
-                return {
-                    'error': 'Maximum retry limit reached',
-                    'requestId': request_id
-                }
+                return True, _retry_limit_error(request_id)
             
             report_response = self.client.get_report_results(request_id)
+            if self._is_processing(report_response):
+                retry_count += 1
+                return False, None
+            return True, report_response
+        
+        return check
+    
+    def _report_check_async(self, request_id):
+        """Like _report_check, but the callable awaits an async client."""
+        retry_count = 0
+        
+        async def check():
+            nonlocal retry_count
+            if self.max_retries is not None and retry_count >= self.max_retries:
+                return True, _retry_limit_error(request_id)
             
-            if isinstance(report_response, dict):
-                if 'errors' in report_response and isinstance(report_response['errors'], list):
-                    for error in report_response['errors']:
-                        if 'code' in error and str(error['code']) in ['410005', '410004']:
-                            retry_count += 1
-                            time.sleep(self.poll_interval)
-                            break
-                    else:
-                        return report_response
-                    
-                    continue
-                
-                elif 'errorCode' in report_response:
-                    error_code = str(report_response['errorCode'])
-                    if error_code in ['410005', '410004']:
-                        retry_count += 1
-                        time.sleep(self.poll_interval)
-                        continue
-            
-            return report_response
+            report_response = await self.client.get_report_results(request_id)
+            if self._is_processing(report_response):
+                retry_count += 1
+                return False, None
+            return True, report_response
+        
+        return check
+    
+    @staticmethod
+    def _is_processing(report_response):
+        """Return True if the response says the report is still being generated."""
+        if not isinstance(report_response, dict):
+            return False
+        if 'errors' in report_response and isinstance(report_response['errors'], list):
+            return any('code' in error and str(error['code']) in ['410005', '410004']
+                       for error in report_response['errors'])
+        if 'errorCode' in report_response:
+            return str(report_response['errorCode']) in ['410005', '410004']
+        return False
     
     def __repr__(self):
         """Return a string representation of the result."""
@@ -121,4 +248,18 @@ class ReportHandler:
         """Get a value from the result with a default if the key is not found."""
         if isinstance(self.result, dict):
             return self.result.get(key, default)
-        return default 
\ No newline at end of file
+        return default
+
+
+def _deadline_error(request_id):
+    return {
+        'error': 'Polling deadline reached',
+        'requestId': request_id
+    }
+
+
+def _retry_limit_error(request_id):
+    return {
+        'error': 'Maximum retry limit reached',
+        'requestId': request_id
+    }
@@ -0,0 +1,134 @@
+"""
+Background polling for the Ultra REST Client.
+
+This module provides a scheduler that runs many polling jobs from one timer
+thread and a small worker pool, so thousands of tasks or reports can be followed
+without a blocked thread per job.
+"""
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+import heapq
+import itertools
+import threading
+import time
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """Return the process-wide PollScheduler, creating it on first use."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PollScheduler()
+        return _default_scheduler
+
+
+class PollScheduler:
+    """
+    Runs polling jobs in the background and completes a Future for each.
+
+    A job is a `check` callable that polls once and returns (finished, result),
+    plus an iterator of delays (see PollingStrategy.delays). The timer thread keeps
+    the jobs in a heap ordered by their next poll time and hands due jobs to the
+    worker pool, so a slow poll never delays the others. Cancelling a job's Future
+    stops its polling.
+    """
+
+    def __init__(self, max_workers=8):
+        """
+        Initialize the PollScheduler.
+
+        Args:
+            max_workers (int, optional): Polls that may run at the same time. Defaults to 8.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PollScheduler")
+        self._heap = []  # (due, sequence, job)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, check, delays, on_deadline=None):
+        """
+        Start polling a job. The first poll runs straight away.
+
+        Args:
+            check (callable): Polls once; returns (finished, result).
+            delays (iterator): Seconds to wait before each further poll. When it is
+                exhausted, the job ends with `on_deadline` as its result.
+            on_deadline (optional): The result when the delays run out. Defaults to None.
+
+        Returns:
+            Future: Resolves to the job's result, or to the exception raised by `check`.
+        """
+        future = Future()
+        self._push(time.monotonic(), (check, delays, on_deadline, future))
+        return future
+
+    @property
+    def pending(self):
+        """The number of jobs waiting for their next poll."""
+        return len(self._heap)
+
+    def _push(self, due, job):
+        with self._condition:
+            heapq.heappush(self._heap, (due, next(self._sequence), job))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="PollScheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heap:
+                        # idle; the next _push starts a new timer thread
+                        self._thread = None
+                        return
+                    due = self._heap[0][0]
+                    now = time.monotonic()
+                    if due <= now:
+                        job = heapq.heappop(self._heap)[2]
+                        break
+                    self._condition.wait(due - now)
+            try:
+                self._executor.submit(self._step, job)
+            except RuntimeError as e:
+                # the interpreter is shutting down; fail the remaining jobs
+                with self._condition:
+                    jobs = [job] + [entry[2] for entry in self._heap]
+                    self._heap.clear()
+                    self._thread = None
+                for job in jobs:
+                    _resolve(job[3], error=e)
+                return
+
+    def _step(self, job):
+        check, delays, on_deadline, future = job
+        if future.cancelled():
+            return
+        try:
+            finished, result = check()
+        except Exception as e:
+            _resolve(future, error=e)
+            return
+        if finished:
+            _resolve(future, result)
+            return
+        delay = next(delays, None)
+        if delay is None:
+            _resolve(future, on_deadline)
+            return
+        self._push(time.monotonic() + delay, job)
+
+
+def _resolve(future, result=None, error=None):
+    """Complete a Future, unless the caller has already cancelled it."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
@@ -4,7 +4,11 @@ Task handling utilities for the Ultra REST Client.
 This module provides utilities for handling asynchronous tasks and location-based responses
 from the UltraDNS API.
 """
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import threading
 import time
+from .polling import PollingStrategy
+from .scheduler import default_scheduler, _resolve
 
 
 class TaskHandler:
@@ -15,22 +19,35 @@ class TaskHandler:
     or a location endpoint until a final result is reached.
     """
     
-    def __init__(self, response, client, poll_interval=1):
+    def __init__(self, response, client, poll_interval=None, polling=None, sink=None, chunk_size=64 * 1024):
         """
         Initialize the TaskHandler with an API response.
         
         Args:
             response: The API response to process.
             client (RestApiClient): The RestApiClient instance to use for API calls.
-            poll_interval (int, optional): The interval in seconds between polling attempts.
-                Defaults to 1.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+                Defaults to None (use `polling`).
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's
+                strategy, which starts fast and backs off for long-running tasks.
+            sink (optional): A file path or writable binary file object. If given, a task's
+                result data is streamed to it in chunks instead of being decoded in memory.
+                Defaults to None.
+            chunk_size (int, optional): Bytes written at a time when streaming to `sink`.
+                Defaults to 64 KiB.
         
         Returns:
             The final result of the task or location polling, or the original response
-            if neither a task_id nor a location is present.
+            if neither a task_id nor a location is present. With a `sink`, a completed task
+            with data gives {'sink': sink, 'bytes': written, 'resultUri': result_uri} instead
+            of the decoded result. If the strategy's deadline passes first, a dict with an
+            'error' key is returned instead.
         """
         self.poll_interval = poll_interval
+        self.polling = _polling_strategy(client, poll_interval, polling)
         self.client = client
+        self.sink = sink
+        self.chunk_size = chunk_size
         
         self.result = self._process_response(response)
     
@@ -52,6 +69,71 @@ class TaskHandler:
         
         return response
     
+    @classmethod
+    def submit(cls, response, client, poll_interval=None, polling=None, scheduler=None, sink=None, chunk_size=64 * 1024):
+        """
+        Start handling an API response without blocking.
+
+        The task or location is polled by a shared background PollScheduler, so a
+        single process can follow thousands of them. This needs the blocking
+        RestApiClient; with AsyncRestApiClient, use wait_async() instead.
+
+        Args:
+            response: The API response to process.
+            client (RestApiClient): The RestApiClient instance to use for API calls.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's.
+            scheduler (PollScheduler, optional): Defaults to the process-wide scheduler.
+            sink (optional): A file path or writable binary file object for the task's result.
+            chunk_size (int, optional): Bytes written at a time to `sink`. Defaults to 64 KiB.
+
+        Returns:
+            Future: Resolves to the same result the blocking TaskHandler would produce.
+        """
+        handler = cls(None, client, poll_interval, polling, sink, chunk_size)
+        scheduler = scheduler or default_scheduler()
+        if isinstance(response, dict) and 'task_id' in response:
+            task_id = response['task_id']
+            return scheduler.schedule(lambda: handler._check_task(task_id), handler.polling.delays(),
+                                      {'error': 'Polling deadline reached', 'task_id': task_id})
+        if isinstance(response, dict) and 'location' in response:
+            location = response['location']
+            return scheduler.schedule(lambda: handler._check_location(location), handler.polling.delays(),
+                                      {'error': 'Polling deadline reached', 'location': location})
+        future = Future()
+        future.set_result(response)
+        return future
+
+    @classmethod
+    async def wait_async(cls, response, client, poll_interval=None, polling=None, sink=None, chunk_size=64 * 1024):
+        """
+        Handle an API response from an AsyncRestApiClient call, without blocking the event loop.
+
+        Polls with asyncio.sleep between the requests, so any number of tasks can be
+        awaited concurrently, e.g. with asyncio.gather.
+
+        Args:
+            response: The API response to process.
+            client (AsyncRestApiClient): The async client to use for API calls.
+            poll_interval (int, optional): A fixed interval in seconds between polling attempts.
+            polling (PollingStrategy, optional): The polling schedule. Defaults to the client's.
+            sink (optional): A file path or writable binary file object for the task's result.
+            chunk_size (int, optional): Bytes written at a time to `sink`. Defaults to 64 KiB.
+
+        Returns:
+            The same result the blocking TaskHandler would produce.
+        """
+        handler = cls(None, client, poll_interval, polling, sink, chunk_size)
+        if isinstance(response, dict) and 'task_id' in response:
+            task_id = response['task_id']
+            return await handler.polling.wait_for_async(lambda: handler._check_task_async(task_id),
+                                                        {'error': 'Polling deadline reached', 'task_id': task_id})
+        if isinstance(response, dict) and 'location' in response:
+            location = response['location']
+            return await handler.polling.wait_for_async(lambda: handler._check_location_async(location),
+                                                        {'error': 'Polling deadline reached', 'location': location})
+        return response
+
     def _handle_task(self, task_id):
         """
         Handle a response containing a task_id.
@@ -65,25 +147,55 @@ class TaskHandler:
         Returns:
             The final result of the task.
         """
-        while True:
-            task_response = self.client.get_task(task_id)
-            
-            if task_response.get('code') in ['PENDING', 'IN_PROCESS']:
-                time.sleep(self.poll_interval)
-                continue
-            
-            if task_response.get('code') == 'ERROR':
-                return task_response
-            
-            if task_response.get('code') == 'COMPLETE':
-                if task_response.get('hasData', False):
-                    result_uri = task_response.get('resultUri')
-                    if result_uri:
-                        return self.client.rest_api_connection.get(result_uri)
-                
-                return task_response
-            
-            return task_response
+        return self.polling.wait_for(lambda: self._check_task(task_id),
+                                     {'error': 'Polling deadline reached', 'task_id': task_id})
+    
+    def _check_task(self, task_id):
+        """
+        Poll a task once.
+        
+        Returns:
+            tuple: (finished, result). When the task completed with data, the result
+                is the data fetched from its resultUri (or, with a sink, what was written
+                to it); otherwise it is the task status.
+        """
+        task_response = self.client.get_task(task_id)
+        
+        if task_response.get('code') in ['PENDING', 'IN_PROCESS']:
+            return False, None
+        
+        result_uri = _result_uri(task_response)
+        if result_uri and self.sink is not None:
+            written = self.client.rest_api_connection.download(result_uri, self.sink, chunk_size=self.chunk_size)
+            return True, self._written(result_uri, written)
+        if result_uri:
+            return True, self.client.rest_api_connection.get(result_uri)
+        
+        return True, task_response
+    
+    async def _check_task_async(self, task_id):
+        """Poll a task once through an async client. See _check_task."""
+        task_response = await self.client.get_task(task_id)
+        
+        if task_response.get('code') in ['PENDING', 'IN_PROCESS']:
+            return False, None
+        
+        result_uri = _result_uri(task_response)
+        if result_uri and self.sink is not None:
+            written = await self.client.rest_api_connection.download(result_uri, self.sink, chunk_size=self.chunk_size)
+            return True, self._written(result_uri, written)
+        if result_uri:
+            return True, await self.client.rest_api_connection.get(result_uri)
+        
+        return True, task_response
+    
+    def _written(self, result_uri, written):
+        """Describe a task result that was streamed to the sink."""
+        return {
+            'sink': self.sink,
+            'bytes': written,
+            'resultUri': result_uri
+        }
     
     def _handle_location(self, location):
         """
@@ -97,16 +209,18 @@ class TaskHandler:
         Returns:
             The final result from the location.
         """
-        while True:
-            location_response = self.client.rest_api_connection.get(location)
-            
-            state = location_response.get('state', '').upper()
-            status = location_response.get('status', '').upper()
-            
-            if state in ['COMPLETED', 'ERROR'] or status in ['COMPLETED', 'ERROR']:
-                return location_response
-            
-            time.sleep(self.poll_interval)
+        return self.polling.wait_for(lambda: self._check_location(location),
+                                     {'error': 'Polling deadline reached', 'location': location})
+    
+    def _check_location(self, location):
+        """Poll a location once. Returns (finished, location_response)."""
+        location_response = self.client.rest_api_connection.get(location)
+        return _location_finished(location_response), location_response
+    
+    async def _check_location_async(self, location):
+        """Poll a location once through an async client. See _check_location."""
+        location_response = await self.client.rest_api_connection.get(location)
+        return _location_finished(location_response), location_response
     
     def __repr__(self):
         """Return a string representation of the result."""
@@ -132,4 +246,186 @@ class TaskHandler:
         """Get a value from the result with a default if the key is not found."""
         if isinstance(self.result, dict):
             return self.result.get(key, default)
-        return default 
\ No newline at end of file
+        return default
+
+
+def _result_uri(task_response):
+    """Return the resultUri of a task that completed with data, or None."""
+    if task_response.get('code') == 'COMPLETE' and task_response.get('hasData', False):
+        return task_response.get('resultUri')
+    return None
+
+
+def _location_finished(location_response):
+    state = location_response.get('state', '').upper()
+    status = location_response.get('status', '').upper()
+    return state in ['COMPLETED', 'ERROR'] or status in ['COMPLETED', 'ERROR']
+
+
+def _polling_strategy(client, poll_interval, polling):
+    """Pick the polling schedule for a handler: explicit strategy, fixed interval, or the client's."""
+    if polling is not None:
+        return polling
+    if poll_interval is not None:
+        return PollingStrategy.fixed(poll_interval)
+    return getattr(client, 'polling', None) or PollingStrategy()
+
+
+class TaskTracker:
+    """
+    A utility class for following many background tasks with a single polling loop.
+
+    Rather than one blocking loop per task, a background thread polls every tracked
+    task together: one get_all_tasks() call per interval updates all of them, and
+    only tasks missing from that listing are fetched one by one with get_task().
+    Each tracked task has a Future that completes when the task finishes, with the
+    same result TaskHandler would produce. An error response for one task (e.g. a
+    404 for an unknown id) completes only that task's Future.
+    """
+
+    def __init__(self, client, poll_interval=1, max_workers=4):
+        """
+        Initialize the TaskTracker.
+
+        Args:
+            client (RestApiClient): The RestApiClient instance to use for API calls.
+            poll_interval (int, optional): The interval in seconds between polls. Defaults to 1.
+            max_workers (int, optional): Threads used for individual task lookups and for
+                fetching task results. Defaults to 4.
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._tasks = {}  # task_id -> Future, for tasks still being polled
+        self._outstanding = set()  # every Future not yet resolved, including result downloads
+        self._lock = threading.Lock()
+        self._thread = None
+        self.bulk_polls = 0
+        self.task_polls = 0
+
+    def track(self, response, callback=None):
+        """
+        Start following a task.
+
+        Args:
+            response: A task id, or an API response containing a task_id. Any other
+                response is passed through as an already completed Future.
+            callback (callable, optional): Called with the Future once the task finishes.
+
+        Returns:
+            Future: Resolves to the task's result data if it has any, otherwise the final
+                task status (including 'ERROR' statuses).
+        """
+        task_id = response.get('task_id') if isinstance(response, dict) else response
+        if not isinstance(task_id, str):
+            future = Future()
+            future.set_result(response)
+        else:
+            with self._lock:
+                future = self._tasks.get(task_id)
+                if future is None:
+                    future = self._tasks[task_id] = Future()
+                    self._outstanding.add(future)
+                    future.add_done_callback(self._outstanding.discard)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="TaskTracker", daemon=True)
+                    self._thread.start()
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    @property
+    def pending(self):
+        """The number of tracked tasks whose Future hasn't completed."""
+        return len(self._outstanding)
+
+    def wait(self, timeout=None):
+        """Block until every tracked task has finished, or the timeout expires."""
+        with self._lock:
+            futures = list(self._outstanding)
+        wait(futures, timeout=timeout)
+
+    def close(self):
+        """Stop the worker threads. Tasks that are still running are no longer followed."""
+        with self._lock:
+            for future in list(self._outstanding):
+                future.cancel()
+            self._tasks.clear()
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.wait()
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._tasks:
+                    self._thread = None
+                    return
+                task_ids = list(self._tasks)
+            try:
+                self._poll(task_ids)
+            except Exception as e:
+                self._fail(task_ids, e)
+            time.sleep(self.poll_interval)
+
+    def _poll(self, task_ids):
+        statuses = {}
+        if len(task_ids) > 1:
+            self.bulk_polls += 1
+            try:
+                listing = self.client.get_all_tasks()
+            except Exception:
+                # fall back to fetching every task on its own
+                listing = None
+            if isinstance(listing, dict):
+                for status in listing.get('tasks') or []:
+                    if isinstance(status, dict) and status.get('taskId') in self._tasks:
+                        statuses[status['taskId']] = status
+
+        missing = [task_id for task_id in task_ids if task_id not in statuses]
+        self.task_polls += len(missing)
+        statuses.update(zip(missing, self._executor.map(self._get_task, missing)))
+
+        for task_id in task_ids:
+            status = statuses[task_id]
+            if isinstance(status, dict) and status.get('code') in ['PENDING', 'IN_PROCESS']:
+                continue
+            with self._lock:
+                future = self._tasks.pop(task_id, None)
+            if future is None:
+                continue
+            if isinstance(status, Exception):
+                _resolve(future, error=status)
+            elif not isinstance(status, dict):
+                # an error response such as [{'errorCode': 70002, ...}] ends only this task
+                _resolve(future, status)
+            elif status.get('code') == 'COMPLETE' and status.get('hasData', False) and status.get('resultUri'):
+                self._executor.submit(self._fetch_result, future, status['resultUri'])
+            else:
+                _resolve(future, status)
+
+    def _get_task(self, task_id):
+        """Return the task's status, or the exception raised fetching it."""
+        try:
+            return self.client.get_task(task_id)
+        except Exception as e:
+            return e
+
+    def _fetch_result(self, future, result_uri):
+        try:
+            _resolve(future, self.client.rest_api_connection.get(result_uri))
+        except Exception as e:
+            _resolve(future, error=e)
+
+    def _fail(self, task_ids, error):
+        with self._lock:
+            futures = [self._tasks.pop(task_id) for task_id in task_ids if task_id in self._tasks]
+        for future in futures:
+            _resolve(future, error=error)
+
@@ -0,0 +1,243 @@
+"""
+BIND zone file utilities for the Ultra REST Client.
+
+This module parses BIND master files (such as those produced by export_zone or
+accepted by create_primary_zone_by_upload) one line at a time, so zone files of
+any size can be validated, split or diffed locally in constant memory.
+"""
+from collections import namedtuple
+import io
+import os
+import re
+
+# One resource record. Owner names are absolute and lower-case, rtype and rclass are
+# upper-case, ttl is in seconds and rdata is the record data as a single string, in
+# the form get_rrsets returns it: domain names in rdata are absolute and lower-case,
+# and TXT/SPF data is the text itself, without quotes or escapes.
+ResourceRecord = namedtuple('ResourceRecord', 'owner ttl rclass rtype rdata')
+
+CLASSES = frozenset({'IN', 'CH', 'HS', 'CS'})
+
+# Positions of domain names in the rdata of common types, qualified like owner names
+_NAME_FIELDS = {
+    'CNAME': (0,), 'DNAME': (0,), 'NS': (0,), 'PTR': (0,),
+    'MX': (1,), 'SRV': (3,), 'SOA': (0, 1)
+}
+_TTL = re.compile(r'^(?:\d+[wdhms]?)+$', re.IGNORECASE)
+_TTL_PART = re.compile(r'(\d+)([wdhms]?)', re.IGNORECASE)
+_TTL_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_ESCAPE = re.compile(r'\\(\d{3}|.)')
+
+
+class ZoneFileError(ValueError):
+    """Raised when a zone file cannot be parsed."""
+
+    def __init__(self, line_number, message):
+        super().__init__(f"line {line_number}: {message}")
+        self.line_number = line_number
+
+
+def iter_zone_records(source, origin=None, default_ttl=None, encoding='utf-8'):
+    """
+    Parse a BIND zone file lazily, one resource record at a time.
+
+    Supports $ORIGIN and $TTL directives, records split over several lines with
+    parentheses (e.g. SOA), comments, quoted strings, '@', relative owner names
+    and lines that start with whitespace to repeat the previous owner. Domain names
+    in the rdata of CNAME, DNAME, NS, PTR, MX, SRV and SOA records are made absolute
+    and lower-case. The character-strings of TXT and SPF records are unquoted,
+    unescaped and concatenated, as the API presents TXT data longer than 255
+    characters as a single string.
+
+    Args:
+        source: A path to the zone file, or an iterable of text lines (e.g. an open file).
+        origin (str, optional): The zone name relative names are resolved against, until
+            the file sets $ORIGIN. Defaults to None.
+        default_ttl (int, optional): TTL for records without one, until the file sets $TTL.
+            Defaults to None (the last TTL seen, or the SOA minimum).
+        encoding (str, optional): Encoding used when `source` is a path. Defaults to 'utf-8'.
+
+    Yields:
+        ResourceRecord: Each record, in file order.
+
+    Raises:
+        ZoneFileError: On a malformed line.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding=encoding) as lines:
+            yield from iter_zone_records(lines, origin, default_ttl)
+        return
+
+    origin = _absolute(origin, '.', 0) if origin else None
+    last_owner = None
+    last_ttl = None
+    for number, continued, tokens in _logical_lines(source):
+        directive = tokens[0].upper()
+        if directive == '$ORIGIN':
+            origin = _absolute(_argument(tokens, number), origin, number)
+            continue
+        if directive == '$TTL':
+            default_ttl = _parse_ttl(_argument(tokens, number), number)
+            continue
+        if directive.startswith('$'):
+            raise ZoneFileError(number, f"unsupported directive {tokens[0]}")
+
+        if continued:
+            if last_owner is None:
+                raise ZoneFileError(number, "record without an owner name")
+            owner = last_owner
+        else:
+            owner = _absolute(tokens.pop(0), origin, number).lower()
+
+        ttl, rclass = None, None
+        while tokens:
+            token = tokens[0].upper()
+            if ttl is None and _TTL.match(token):
+                ttl = _parse_ttl(token, number)
+            elif rclass is None and token in CLASSES:
+                rclass = token
+            else:
+                break
+            tokens.pop(0)
+        if not tokens:
+            raise ZoneFileError(number, "missing record type")
+        rtype = tokens.pop(0).upper()
+
+        for index in _NAME_FIELDS.get(rtype, ()):
+            if index < len(tokens) and not tokens[index].startswith('"'):
+                tokens[index] = _absolute(tokens[index], origin, number).lower()
+        if rtype in ('TXT', 'SPF'):
+            rdata = ''.join(_text(token) for token in tokens)
+        else:
+            rdata = ' '.join(tokens)
+
+        if ttl is None:
+            ttl = default_ttl if default_ttl is not None else last_ttl
+        if ttl is None and rtype == 'SOA' and len(tokens) == 7:
+            ttl = _parse_ttl(tokens[6], number)
+        if ttl is None:
+            raise ZoneFileError(number, "no TTL given and no $TTL in effect")
+
+        last_owner, last_ttl = owner, ttl
+        yield ResourceRecord(owner, ttl, rclass or 'IN', rtype, rdata)
+
+
+def parse_zone_text(text, origin=None, default_ttl=None):
+    """Parse zone file text already in memory, e.g. the result of export_zone."""
+    return iter_zone_records(io.StringIO(text), origin, default_ttl)
+
+
+def group_rrsets(records):
+    """
+    Combine resource records into RRSets shaped like the items returned by get_rrsets.
+
+    Records of the same owner and type are merged, in the order the RRSets first
+    appear; each RRSet takes the TTL of its first record. This holds one entry per
+    RRSet in memory.
+
+    Args:
+        records (iterable): ResourceRecords, e.g. from iter_zone_records.
+
+    Returns:
+        list: Dicts with 'ownerName', 'rrtype', 'ttl' and 'rdata'.
+    """
+    rrsets = {}
+    for record in records:
+        rrset = rrsets.get((record.owner, record.rtype))
+        if rrset is None:
+            rrsets[(record.owner, record.rtype)] = {
+                'ownerName': record.owner,
+                'rrtype': record.rtype,
+                'ttl': record.ttl,
+                'rdata': [record.rdata]
+            }
+        elif record.rdata not in rrset['rdata']:
+            rrset['rdata'].append(record.rdata)
+    return list(rrsets.values())
+
+
+def _logical_lines(lines):
+    """Yield (line_number, continued, tokens) for each record, joining parenthesised lines."""
+    tokens = []
+    depth = 0
+    start = continued = None
+    for number, line in enumerate(lines, 1):
+        if depth == 0:
+            start, continued, tokens = number, line[:1] in (' ', '\t'), []
+        depth += _tokenize(line, tokens, number)
+        if depth < 0:
+            raise ZoneFileError(number, "unbalanced ')'")
+        if depth == 0 and tokens:
+            yield start, continued, tokens
+    if depth:
+        raise ZoneFileError(start, "unbalanced '('")
+
+
+def _tokenize(line, tokens, number):
+    """Append the tokens of a line to `tokens` and return the change in parenthesis depth."""
+    if '"' not in line:
+        line = line.split(';', 1)[0]
+        depth = line.count('(') - line.count(')')
+        tokens.extend(line.replace('(', ' ').replace(')', ' ').split())
+        return depth
+
+    depth = 0
+    token = []
+    quoted = escaped = False
+    for char in line:
+        if quoted:
+            token.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            token.append(char)
+            quoted = True
+        elif char == ';':
+            break
+        elif char in '() \t\r\n':
+            if token:
+                tokens.append(''.join(token))
+                token = []
+            depth += {'(': 1, ')': -1}.get(char, 0)
+        else:
+            token.append(char)
+    if quoted:
+        raise ZoneFileError(number, "unterminated quoted string")
+    if token:
+        tokens.append(''.join(token))
+    return depth
+
+
+def _text(token):
+    """Return the text of a character-string, without its quotes or escapes."""
+    if token.startswith('"'):
+        token = token[1:-1]
+    return _ESCAPE.sub(lambda match: chr(int(match.group(1))) if match.group(1).isdigit() else match.group(1), token)
+
+
+def _argument(tokens, number):
+    if len(tokens) < 2:
+        raise ZoneFileError(number, f"{tokens[0]} needs a value")
+    return tokens[1]
+
+
+def _absolute(name, origin, number):
+    if name == '@':
+        if origin is None:
+            raise ZoneFileError(number, "'@' used without an origin")
+        return origin
+    if name.endswith('.'):
+        return name
+    if origin is None:
+        raise ZoneFileError(number, f"relative name '{name}' used without an origin")
+    return name + '.' if origin == '.' else f"{name}.{origin}"
+
+
+def _parse_ttl(value, number):
+    if not _TTL.match(value):
+        raise ZoneFileError(number, f"invalid TTL '{value}'")
+    return sum(int(amount) * _TTL_UNITS[unit.lower()] for amount, unit in _TTL_PART.findall(value))
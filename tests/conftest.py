@@ -0,0 +1,10 @@
+import pytest
+
+from stand_in import StandInServer
+
+
+@pytest.fixture
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
@@ -0,0 +1,267 @@
+"""
+A small in-process stand-in for the UltraDNS REST API, used by the tests.
+
+It implements just enough of the API for the client's connection handling to be
+exercised end to end: token grants, token expiry (errorCode 60001), paged RRSet
+listings, RRSet writes, /v1/batch, multipart zone upload, zone export tasks and
+reports.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import io
+import json
+import re
+import threading
+import time
+import zipfile
+
+
+class StandInServer:
+    """An HTTP server on a free local port; `url` is passed to the client as its host."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.token = 0
+        self.grants = []  # grant_type of every token request
+        self.requests = []  # (method, path) of every API request
+        self.rrsets = {}  # zone -> {(owner, rrtype): {'ttl': ..., 'rdata': [...]}}
+        self.tasks = {}  # task_id -> {'polls': ..., 'zones': [...]}
+        self.uploads = []  # (content_type, body) of every multipart upload
+        self.reports = {}  # request_id -> polls left before the report is ready
+        self.expires_in = 3600  # expiresIn of granted tokens
+        self.latency = 0  # seconds each API request takes
+        self.throttle = 0  # the next API requests to answer with 429
+        self.attempts = []  # (method, path, query, content_type, body) of every API request, throttled or not
+        self.in_flight = 0
+        self.peak_in_flight = 0  # most API requests handled at once
+        self.task_polls = 2
+        self.report_polls = 2
+        self.max_limit = None  # cap applied to the limit of RRSet listings
+        self.total_count = True  # include resultInfo.totalCount in listings
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def expire_token(self):
+        """Invalidate the current access token, so the next request gets errorCode 60001."""
+        with self.lock:
+            self.token += 1
+
+    def add_rrset(self, zone, owner, rrtype, ttl, rdata):
+        self.rrsets.setdefault(zone, {})[(owner, rrtype)] = {'ttl': ttl, 'rdata': list(rdata)}
+
+    def grant(self, grant_type):
+        with self.lock:
+            self.grants.append(grant_type)
+            self.token += 1
+            return {
+                'accessToken': f"token{self.token}",
+                'refreshToken': f"refresh{self.token}",
+                'expiresIn': str(self.expires_in)
+            }
+
+    def authorized(self, header):
+        return header == f"Bearer token{self.token}"
+
+    def list_rrsets(self, zone, rrtype, offset, limit):
+        if self.max_limit is not None:
+            limit = min(limit, self.max_limit)
+        items = [
+            {'ownerName': owner, 'rrtype': f"{kind} (1)", 'ttl': rrset['ttl'], 'rdata': rrset['rdata']}
+            for (owner, kind), rrset in sorted(self.rrsets.get(zone, {}).items())
+            if rrtype is None or kind == rrtype
+        ]
+        if not items:
+            return 404, [{'errorCode': 70002, 'errorMessage': 'Data not found.'}]
+        page = items[offset:offset + limit]
+        info = {'offset': offset, 'returnedCount': len(page)}
+        if self.total_count:
+            info['totalCount'] = len(items)
+        return 200, {'zoneName': zone, 'rrSets': page, 'resultInfo': info}
+
+    def write_rrset(self, method, uri, body):
+        match = re.match(r"^/v1/zones/([^/]+)/rrsets/([^/]+)/([^/]+)$", uri)
+        if not match:
+            return 404, {'errorCode': 404, 'errorMessage': 'Not found'}
+        zone, rrtype, owner = match.groups()
+        if not owner.endswith('.'):
+            owner = f"{owner}.{zone}"
+        rrsets = self.rrsets.setdefault(zone, {})
+        key = (owner, rrtype)
+        if method == 'POST':
+            if key in rrsets:
+                return 400, {'errorCode': 2111, 'errorMessage': 'Resource Record of type already exists.'}
+            rrsets[key] = {'ttl': body['ttl'], 'rdata': body['rdata']}
+        elif method == 'PUT':
+            rrsets[key] = {'ttl': body['ttl'], 'rdata': body['rdata']}
+        elif key not in rrsets:
+            return 404, {'errorCode': 70002, 'errorMessage': 'Data not found.'}
+        elif method == 'PATCH':
+            rrsets[key]['rdata'] = body['rdata']
+        elif method == 'DELETE':
+            del rrsets[key]
+        return 200, {'message': 'Successful'}
+
+    def export(self, zones):
+        with self.lock:
+            task_id = f"task{len(self.tasks)}"
+            self.tasks[task_id] = {'polls': self.task_polls, 'zones': zones}
+        return task_id
+
+    def create_report(self):
+        with self.lock:
+            request_id = f"report{len(self.reports)}"
+            self.reports[request_id] = self.report_polls
+        return {'requestId': request_id}
+
+    def report_results(self, request_id):
+        with self.lock:
+            self.reports[request_id] -= 1
+            if self.reports[request_id] > 0:
+                return 400, {'errorCode': 410004, 'errorMessage': 'Report is being processed'}
+        return 200, {'requestId': request_id, 'results': [{'zoneName': 'example.com.', 'queries': 42}]}
+
+    def task_status(self, task_id):
+        task = self.tasks[task_id]
+        task['polls'] -= 1
+        return {
+            'taskId': task_id,
+            'code': 'IN_PROCESS' if task['polls'] > 0 else 'COMPLETE',
+            'hasData': True,
+            'resultUri': f"/v1/tasks/{task_id}/result"
+        }
+
+
+def zone_text(zone):
+    return f"$ORIGIN {zone}\n@ 300 IN A 192.0.2.1\nwww 300 IN CNAME @\n"
+
+
+def _handler(server):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def do_PUT(self):
+            self._handle('PUT')
+
+        def do_PATCH(self):
+            self._handle('PATCH')
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+        def _send(self, status, body=None, content_type='application/json', headers=None):
+            data = b''
+            if body is not None:
+                data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            if body is not None:
+                self.send_header('Content-Type', content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self, method):
+            url = urlparse(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+
+            if url.path == '/v1/authorization/token':
+                form = {name: values[0] for name, values in parse_qs(raw.decode()).items()}
+                return self._send(200, server.grant(form.get('grant_type')))
+            if not server.authorized(self.headers.get('Authorization')):
+                return self._send(400, {'errorCode': 60001, 'errorMessage': 'invalid_grant:token not found, expired or invalid'})
+            with server.lock:
+                server.attempts.append((method, url.path, url.query, self.headers.get('Content-Type'), raw))
+                if server.throttle:
+                    server.throttle -= 1
+                    return self._send(429, {'errorCode': 429, 'errorMessage': 'Too many requests'},
+                                      headers={'Retry-After': '0'})
+                server.requests.append((method, url.path))
+                server.in_flight += 1
+                server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            try:
+                if server.latency:
+                    time.sleep(server.latency)
+                return self._route(method, url.path, query, raw)
+            finally:
+                with server.lock:
+                    server.in_flight -= 1
+
+        def _route(self, method, path, query, raw):
+            body = None
+            if raw and 'multipart' not in (self.headers.get('Content-Type') or ''):
+                body = json.loads(raw)
+                if isinstance(body, str):
+                    body = json.loads(body)
+
+            if path == '/v1/version':
+                return self._send(200, {'version': 'stand-in'})
+            listing = re.match(r"^/v1/zones/([^/]+)/rrsets(?:/([^/]+))?$", path)
+            if listing and method == 'GET':
+                status, page = server.list_rrsets(listing.group(1), listing.group(2),
+                                                  int(query.get('offset', 0)), int(query.get('limit', 100)))
+                return self._send(status, page)
+            if path == '/v1/batch':
+                results = []
+                for operation in body:
+                    status, response = server.write_rrset(operation['method'], operation['uri'], operation.get('body'))
+                    results.append({'status': status, 'response': response})
+                return self._send(200, results)
+            if path == '/v1/zones' and method == 'POST':
+                server.uploads.append((self.headers.get('Content-Type'), raw))
+                return self._send(202, {'message': 'Pending'}, headers={'X-Task-Id': 'upload'})
+            if path == '/v3/zones/export' and method == 'POST':
+                task_id = server.export(body['zoneNames'])
+                return self._send(202, {'message': 'Pending'}, headers={'X-Task-Id': task_id})
+            if path.startswith('/v1/reports/') and method == 'POST':
+                return self._send(202, server.create_report())
+            report = re.match(r"^/v1/requests/([^/]+)$", path)
+            if report and method == 'GET':
+                return self._send(*server.report_results(report.group(1)))
+            if path == '/v1/tasks' and method == 'GET':
+                return self._send(200, {'tasks': [server.task_status(task_id) for task_id in list(server.tasks)]})
+            task = re.match(r"^/v1/tasks/([^/]+)(/result)?$", path)
+            if task:
+                return self._task(method, task.group(1), bool(task.group(2)))
+            status, response = server.write_rrset(method, path, body)
+            return self._send(status, response)
+
+        def _task(self, method, task_id, result):
+            if task_id not in server.tasks:
+                return self._send(404, [{'errorCode': 70002, 'errorMessage': 'Task not found'}])
+            if method == 'DELETE':
+                del server.tasks[task_id]
+                return self._send(204)
+            if not result:
+                return self._send(200, server.task_status(task_id))
+            zones = server.tasks[task_id]['zones']
+            if len(zones) == 1:
+                return self._send(200, zone_text(zones[0]).encode(), content_type='text/plain')
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w') as zip_file:
+                for zone in zones:
+                    zip_file.writestr(f"{zone}txt", zone_text(zone))
+            return self._send(200, archive.getvalue(), content_type='application/zip')
+
+    return Handler
@@ -0,0 +1,308 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from ultra_rest_client import AdaptiveConcurrency, AsyncRestApiClient, PollingStrategy, ReportHandler, TaskHandler
+from stand_in import zone_text
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def client_for(server, **kwargs):
+    kwargs.setdefault('polling', PollingStrategy.fixed(0.01))
+    return AsyncRestApiClient("user", "password", use_http=True, host=server.url[len("http://"):], **kwargs)
+
+
+def test_password_auth_happens_on_first_request(server):
+    async def scenario():
+        client = client_for(server)
+        assert server.grants == []
+        async with client:
+            results = await asyncio.gather(*(client.version() for _ in range(10)))
+        return results
+
+    results = run(scenario())
+    assert results == [{'version': 'stand-in'}] * 10
+    assert server.grants == ['password']
+
+
+def test_expired_token_is_refreshed_once_and_requests_replayed(server):
+    async def scenario():
+        async with client_for(server) as client:
+            await client.version()
+            server.expire_token()
+            return await asyncio.gather(*(client.version() for _ in range(20)))
+
+    results = run(scenario())
+    assert results == [{'version': 'stand-in'}] * 20
+    assert server.grants == ['password', 'refresh_token']
+
+
+def test_create_primary_zone_by_upload_sends_multipart(server, tmp_path):
+    bind_file = tmp_path / "example.com.txt"
+    bind_file.write_text(zone_text("example.com."))
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.create_primary_zone_by_upload("account", "example.com.", str(bind_file))
+
+    result = run(scenario())
+    assert result['task_id'] == 'upload'
+    [(content_type, body)] = server.uploads
+    assert content_type.startswith('multipart/form-data')
+    assert b'"createType": "UPLOAD"' in body
+    assert zone_text("example.com.").encode() in body
+
+
+def test_export_zone_polls_task_and_clears_it(server):
+    server.task_polls = 3
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.export_zone("example.com.")
+
+    assert run(scenario()) == zone_text("example.com.")
+    assert server.requests.count(('GET', '/v1/tasks/task0')) == 3
+    assert ('DELETE', '/v1/tasks/task0') in server.requests
+    assert server.tasks == {}
+
+
+def test_plain_with_statement_is_rejected(server):
+    client = client_for(server)
+    with pytest.raises(TypeError, match="async with"):
+        with client:
+            pass
+    with pytest.raises(TypeError, match="async with"):
+        with client.rest_api_connection:
+            pass
+
+
+def test_offset_iterators_are_async_generators(server):
+    server.max_limit = 100
+    for i in range(250):
+        server.add_rrset("example.com.", f"host{i:04}.example.com.", "A", 300, ["192.0.2.1"])
+    server.add_rrset("example.com.", "example.com.", "MX", 300, ["10 mail.example.com."])
+
+    async def scenario():
+        async with client_for(server) as client:
+            everything = await client.fetch_all_rrsets("example.com.", page_size=500, max_workers=2)
+            unordered = [rrset async for rrset in client.iter_rrsets("example.com.", ordered=False)]
+            mx = [rrset async for rrset in client.iter_rrsets_by_type("example.com.", "MX")]
+            return everything, unordered, mx
+
+    everything, unordered, mx = run(scenario())
+    assert len(everything) == 251
+    assert [rrset['ownerName'] for rrset in everything] == sorted(rrset['ownerName'] for rrset in everything)
+    assert sorted(rrset['ownerName'] for rrset in unordered) == sorted(rrset['ownerName'] for rrset in everything)
+    assert [rrset['rdata'] for rrset in mx] == [["10 mail.example.com."]]
+
+
+def test_batch_bulk_keeps_results_aligned(server):
+    server.add_rrset("example.com.", "host0007.example.com.", "A", 300, ["192.0.2.1"])
+    operations = [
+        {'method': 'POST', 'uri': f"/v1/zones/example.com./rrsets/A/host{i:04}", 'body': {'ttl': 300, 'rdata': ["192.0.2.2"]}}
+        for i in range(250)
+    ]
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.batch_bulk(operations, chunk_size=100, max_workers=2)
+
+    results = run(scenario())
+    assert [result['status'] for result in results] == [400 if i == 7 else 200 for i in range(250)]
+    assert server.requests.count(('POST', '/v1/batch')) == 3
+    assert len(server.rrsets["example.com."]) == 250
+
+
+def test_deferred_records_writes_of_the_current_task_only(server):
+    async def elsewhere(client, started):
+        await started.wait()
+        return await client.create_rrset("example.com.", "A", "direct", 300, "192.0.2.9")
+
+    async def scenario():
+        async with client_for(server) as client:
+            started = asyncio.Event()
+            other = asyncio.ensure_future(elsewhere(client, started))
+            async with client.deferred() as batch:
+                futures = [await client.create_rrset("example.com.", "A", f"host{i}", 300, "192.0.2.1") for i in range(3)]
+                started.set()
+                direct = await other
+                assert not any(future.done() for future in futures)
+                assert len(batch.operations) == 3
+            return direct, [await future for future in futures]
+
+    direct, results = run(scenario())
+    assert direct == {'message': 'Successful'}
+    assert [result['status'] for result in results] == [200, 200, 200]
+    assert server.requests.count(('POST', '/v1/batch')) == 1
+    assert len(server.rrsets["example.com."]) == 4
+
+
+def test_deferred_sends_requests_other_than_rrset_writes(server):
+    async def scenario():
+        async with client_for(server) as client:
+            async with client.deferred() as batch:
+                future = await client.create_rrset("example.com.", "A", "host", 300, "192.0.2.1")
+                exported = await client.export_zone("example.com.")
+                assert len(batch.operations) == 1
+            return await future, exported
+
+    result, exported = run(scenario())
+    assert result['status'] == 200
+    assert exported == zone_text("example.com.")
+    assert server.tasks == {}
+
+
+def test_deferred_block_that_raises_sends_nothing(server):
+    async def scenario():
+        async with client_for(server) as client:
+            with pytest.raises(RuntimeError):
+                async with client.deferred():
+                    future = await client.create_rrset("example.com.", "A", "host", 300, "192.0.2.1")
+                    raise RuntimeError
+            return future
+
+    assert run(scenario()).cancelled()
+    assert server.rrsets == {}
+
+
+def test_reconcile_zone_applies_the_plan(server):
+    server.add_rrset("example.com.", "keep.example.com.", "A", 300, ["192.0.2.1"])
+    server.add_rrset("example.com.", "edit.example.com.", "A", 300, ["192.0.2.1"])
+    server.add_rrset("example.com.", "drop.example.com.", "A", 300, ["192.0.2.1"])
+    desired = [
+        {'ownerName': 'keep', 'rrtype': 'A', 'ttl': 300, 'rdata': '192.0.2.1'},
+        {'ownerName': 'edit', 'rrtype': 'A', 'ttl': 300, 'rdata': ['192.0.2.2']},
+        {'ownerName': 'new', 'rrtype': 'A', 'ttl': 300, 'rdata': ['192.0.2.3']}
+    ]
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.reconcile_zone("example.com.", desired)
+
+    plan, results = run(scenario())
+    assert plan.summary() == {'create': 1, 'patch': 1, 'update': 0, 'delete': 1, 'unchanged': 1}
+    assert [result['status'] for result in results] == [200, 200, 200]
+    assert {owner: rrset['rdata'] for (owner, _), rrset in server.rrsets["example.com."].items()} == {
+        'keep.example.com.': ['192.0.2.1'],
+        'edit.example.com.': ['192.0.2.2'],
+        'new.example.com.': ['192.0.2.3']
+    }
+
+
+def test_sync_zone_from_file_keeps_unchanged_mx_and_txt_and_creates_the_new_record(server, tmp_path):
+    server.add_rrset("example.com.", "mx.example.com.", "MX", 300, ["10 mail.example.com."])
+    server.add_rrset("example.com.", "txt.example.com.", "TXT", 300, ["hello; world"])
+    bind_file = tmp_path / "example.com.txt"
+    bind_file.write_text('$ORIGIN Example.COM.\n$TTL 300\nmx MX 10 Mail\ntxt TXT "hello;" " world"\nnew A 192.0.2.1\n')
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.sync_zone_from_file("example.com.", str(bind_file))
+
+    plan, results = run(scenario())
+    assert plan.summary() == {'create': 1, 'patch': 0, 'update': 0, 'delete': 0, 'unchanged': 2}
+    assert [result['status'] for result in results] == [200]
+
+
+def test_import_rrsets_reads_windows_and_reports_progress(server, tmp_path):
+    source = tmp_path / "records.csv"
+    source.write_text("owner,type,ttl,rdata\n" + "".join(f"host{i // 2},A,300,192.0.2.{i}\n" for i in range(10)))
+    progress = []
+
+    async def scenario():
+        async with client_for(server) as client:
+            return await client.import_rrsets(str(source), zone_name="example.com.", window=4, progress=progress.append)
+
+    report = run(scenario())
+    assert report == {'rows': 10, 'rrsets': 5, 'created': 10, 'failed': 0, 'errors': []}
+    assert [totals['rows'] for totals in progress] == [4, 8, 10]
+    assert server.rrsets["example.com."][('host1.example.com.', 'A')]['rdata'] == ['192.0.2.2', '192.0.2.3']
+
+
+def test_export_zones_yields_every_zone(server, tmp_path):
+    zones = [f"zone{i}.com." for i in range(5)]
+
+    async def scenario():
+        async with client_for(server) as client:
+            texts = {zone: text async for zone, text in client.export_zones(zones, chunk_size=2, max_workers=2)}
+            paths = {zone: path async for zone, path in client.export_zones(zones[:1], output_dir=str(tmp_path / "out"))}
+            return texts, paths
+
+    texts, paths = run(scenario())
+    assert texts == {zone: zone_text(zone) for zone in zones}
+    assert (tmp_path / "out" / "zone0.com.txt").read_text() == zone_text("zone0.com.")
+    assert list(paths) == ["zone0.com."]
+    assert server.tasks == {}
+
+
+def test_export_zones_stopped_early_clears_its_tasks(server):
+    async def scenario():
+        async with client_for(server) as client:
+            exports = client.export_zones([f"zone{i}.com." for i in range(6)], chunk_size=1, max_workers=3)
+            await exports.__anext__()
+            await exports.aclose()
+
+    run(scenario())
+    assert server.tasks == {}
+
+
+def test_task_handler_wait_async_awaits_the_async_client(server, tmp_path):
+    sink = tmp_path / "export.txt"
+
+    async def export(client, zone):
+        return await client.rest_api_connection.post("/v3/zones/export", json=json.dumps({'zoneNames': [zone]}))
+
+    async def scenario():
+        async with client_for(server) as client:
+            responses = await asyncio.gather(*(export(client, f"zone{i}.com.") for i in range(20)))
+            results = await asyncio.gather(*(TaskHandler.wait_async(response, client) for response in responses))
+            streamed = await TaskHandler.wait_async(await export(client, "big.com."), client, sink=str(sink))
+            server.task_polls = 1000
+            timed_out = await TaskHandler.wait_async(await export(client, "slow.com."), client,
+                                                     polling=PollingStrategy.fixed(0.01, deadline=0.05))
+            return results, streamed, timed_out
+
+    results, streamed, timed_out = run(scenario())
+    assert results == [zone_text(f"zone{i}.com.") for i in range(20)]
+    assert streamed == {'sink': str(sink), 'bytes': len(zone_text("big.com.")), 'resultUri': '/v1/tasks/task20/result'}
+    assert sink.read_text() == zone_text("big.com.")
+    assert timed_out == {'error': 'Polling deadline reached', 'task_id': 'task21'}
+
+
+def test_report_handler_wait_async_awaits_the_async_client(server):
+    server.report_polls = 3
+
+    async def scenario():
+        async with client_for(server) as client:
+            responses = await asyncio.gather(*(
+                client.create_projected_query_volume_report(f"account{i}") for i in range(10)
+            ))
+            reports = await asyncio.gather(*(ReportHandler.wait_async(response, client) for response in responses))
+            late = await client.create_projected_query_volume_report("account")
+            limited = await ReportHandler.wait_async(late, client, max_retries=1)
+            return responses, reports, late, limited
+
+    responses, reports, late, limited = run(scenario())
+    assert [report['requestId'] for report in reports] == [response['requestId'] for response in responses]
+    assert {report['requestId'] for report in reports} == {f"report{i}" for i in range(10)}
+    assert all(report['results'][0]['queries'] == 42 for report in reports)
+    assert limited == {'error': 'Maximum retry limit reached', 'requestId': late['requestId']}
+
+
+def test_concurrency_governor_bounds_requests_in_flight(server):
+    server.latency = 0.02
+    governor = AdaptiveConcurrency(initial=3, max_limit=3)
+
+    async def scenario():
+        async with client_for(server, concurrency=governor) as client:
+            return await asyncio.gather(*(client.version() for _ in range(20)))
+
+    assert run(scenario()) == [{'version': 'stand-in'}] * 20
+    assert server.peak_in_flight == 3
+    assert governor.in_flight == 0
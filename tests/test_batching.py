@@ -0,0 +1,26 @@
+from concurrent.futures import Future
+
+from ultra_rest_client import PollingStrategy, RestApiClient
+from stand_in import zone_text
+
+
+def client_for(server):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):],
+                         polling=PollingStrategy.fixed(0.01))
+
+
+def test_deferred_records_rrset_writes_and_sends_everything_else(server):
+    server.add_rrset("example.com.", "old.example.com.", "A", 300, ["192.0.2.1"])
+    with client_for(server) as client:
+        with client.deferred() as batch:
+            created = client.create_rrset("example.com.", "A", "new", 300, "192.0.2.2")
+            removed = client.delete_rrset("example.com.", "A", "old")
+            exported = client.export_zone("example.com.")
+            assert isinstance(created, Future) and isinstance(removed, Future)
+            assert [operation['method'] for operation in batch.operations] == ['POST', 'DELETE']
+
+    assert exported == zone_text("example.com.")
+    assert server.tasks == {}
+    assert [created.result()['status'], removed.result()['status']] == [200, 200]
+    assert server.requests.count(('POST', '/v1/batch')) == 1
+    assert list(server.rrsets["example.com."]) == [('new.example.com.', 'A')]
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from ultra_rest_client.cache import ResponseCache
+
+
+CACHED = [
+    "/v1/zones",
+    "/v1/accounts/acme/zones",
+    "/v1/zones/example.com.",
+    "/v1/zones/example.com./rrsets",
+    "/v1/zones/example.com./rrsets/A",
+    "/v1/zones/example.com./rrsets/A/www",
+    "/v1/zones/example.com./rrsets/MX",
+    "/v1/zones/example.com./rrsets/MX/@",
+    "/v1/zones/example.com./rrsets/16/txt",
+    "/v1/zones/other.com./rrsets",
+]
+
+
+def filled_cache():
+    cache = ResponseCache()
+    for uri in CACHED:
+        hit, _, pending = cache.lookup(uri, None)
+        assert not hit
+        cache.store(pending, {'uri': uri})
+    return cache
+
+
+def cached(cache):
+    return [uri for uri in CACHED if cache.lookup(uri, None)[0]]
+
+
+def dropped(method, uri, body=None):
+    cache = filled_cache()
+    cache.invalidate(method, uri, body)
+    return [uri for uri in CACHED if uri not in cached(cache)]
+
+
+@pytest.mark.parametrize("method, uri, expected", [
+    ("GET", "/v1/zones/example.com./rrsets/A/www", []),
+    ("PATCH", "/v1/zones/example.com./rrsets/A/www", [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/A",
+        "/v1/zones/example.com./rrsets/A/www",
+    ]),
+    ("post", "/v1/zones/EXAMPLE.com/rrsets/mx/@", [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/MX",
+        "/v1/zones/example.com./rrsets/MX/@",
+    ]),
+    ("PUT", "/v1/zones/example.com./rrsets/1/www", [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/A",
+        "/v1/zones/example.com./rrsets/A/www",
+    ]),
+    ("DELETE", "/v1/zones/example.com./rrsets/TXT/txt", [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/16/txt",
+    ]),
+    ("DELETE", "/v1/zones/example.com./rrsets/65280/www", [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/A",
+        "/v1/zones/example.com./rrsets/A/www",
+        "/v1/zones/example.com./rrsets/MX",
+        "/v1/zones/example.com./rrsets/MX/@",
+        "/v1/zones/example.com./rrsets/16/txt",
+    ]),
+    ("PUT", "/v1/zones/example.com./dnssec", [uri for uri in CACHED if "example.com." in uri]),
+    ("DELETE", "/v1/zones/example.com.", ["/v1/zones", "/v1/accounts/acme/zones"] +
+     [uri for uri in CACHED if "example.com." in uri]),
+    ("POST", "/v1/zones", ["/v1/zones", "/v1/accounts/acme/zones"]),
+    ("POST", "/v1/accounts/acme/users", []),
+])
+def test_invalidate_drops_what_the_write_affects(method, uri, expected):
+    assert dropped(method, uri) == expected
+
+
+def test_invalidate_walks_batch_operations():
+    body = json.dumps([
+        {'method': 'DELETE', 'uri': '/v1/zones/example.com./rrsets/MX/@'},
+        {'method': 'POST', 'uri': '/v1/zones/other.com./rrsets/A/new'},
+    ])
+    assert dropped("POST", "/v1/batch", body) == [
+        "/v1/zones/example.com.",
+        "/v1/zones/example.com./rrsets",
+        "/v1/zones/example.com./rrsets/MX",
+        "/v1/zones/example.com./rrsets/MX/@",
+        "/v1/zones/other.com./rrsets",
+    ]
+
+
+def test_response_in_flight_during_a_write_is_not_stored():
+    cache = ResponseCache()
+    _, _, pending = cache.lookup("/v1/zones/example.com./rrsets", None)
+    cache.invalidate("POST", "/v1/zones/example.com./rrsets/A/www")
+    cache.store(pending, {'rrSets': []})
+    assert cache.lookup("/v1/zones/example.com./rrsets", None)[0] is False
@@ -0,0 +1,46 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ultra_rest_client import AdaptiveConcurrency, RestApiClient
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_throttled_and_server_error_responses_cut_the_limit(status):
+    governor = AdaptiveConcurrency(initial=8)
+    governor.release(governor.acquire(), status)
+    assert governor.limit == 4
+    assert governor.stats()['congestion_events'] == 1
+
+
+def test_healthy_responses_grow_the_limit():
+    governor = AdaptiveConcurrency(initial=2, max_limit=3)
+    for _ in range(20):
+        governor.release(governor.acquire(), 200)
+    assert governor.limit == 3
+
+
+def test_acquire_async_waits_for_a_released_slot():
+    async def scenario():
+        governor = AdaptiveConcurrency(initial=1, max_limit=1)
+        first = await governor.acquire_async()
+        waiting = asyncio.ensure_future(governor.acquire_async())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        # releasing from another thread wakes the coroutine
+        await asyncio.to_thread(governor.release, first, 200)
+        await asyncio.wait_for(waiting, 1)
+        return governor.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_sync_client_keeps_requests_within_the_limit(server):
+    server.latency = 0.02
+    governor = AdaptiveConcurrency(initial=2, max_limit=2)
+    with RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):], concurrency=governor) as client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.version(), range(16)))
+    assert results == [{'version': 'stand-in'}] * 16
+    assert server.peak_in_flight == 2
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from ultra_rest_client import RestApiClient, RetryPolicy
+from stand_in import zone_text
+
+
+def client_for(server, **kwargs):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):], **kwargs)
+
+
+def test_short_lived_token_is_not_refreshed_on_every_request(server):
+    server.expires_in = 30
+    with client_for(server) as client:
+        for _ in range(5):
+            assert client.version() == {'version': 'stand-in'}
+    assert server.grants == ['password']
+
+
+def test_token_is_refreshed_half_way_through_a_short_lifetime(server):
+    server.expires_in = 0.4
+    with client_for(server) as client:
+        client.version()
+        time.sleep(0.25)
+        client.version()
+    assert server.grants == ['password', 'refresh_token']
+
+
+def test_expired_token_is_refreshed_once_across_threads(server):
+    with client_for(server) as client:
+        client.version()
+        server.expire_token()
+        barrier = threading.Barrier(32)
+
+        def call(_):
+            barrier.wait()
+            return client.version()
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(call, range(32)))
+
+    assert results == [{'version': 'stand-in'}] * 32
+    assert server.grants == ['password', 'refresh_token']
+
+
+def test_throttled_requests_are_replayed_unchanged(server, tmp_path):
+    bind_file = tmp_path / "example.com.txt"
+    bind_file.write_text(zone_text("example.com."))
+    policy = RetryPolicy(backoff_base=0.01)
+    with client_for(server, retry_policy=policy) as client:
+        server.throttle = 2
+        assert client.create_primary_zone_by_upload("account", "example.com.", str(bind_file))['task_id'] == 'upload'
+        server.throttle = 2
+        client.create_rrset("example.com.", "A", "www", 300, ["192.0.2.1"])
+        server.throttle = 2
+        client.get_rrsets("example.com.", offset=0, limit=5)
+
+    assert len(server.attempts) == 9
+    upload, create, listing = (server.attempts[i:i + 3] for i in range(0, 9, 3))
+    assert [attempt[1] for attempt in upload] == ['/v1/zones'] * 3
+    # the multipart boundary is chosen per request; the rest must match byte for byte
+    boundaries = [attempt[3].split('boundary=')[1].encode() for attempt in upload]
+    bodies = {attempt[4].replace(boundary, b'BOUNDARY') for attempt, boundary in zip(upload, boundaries)}
+    assert len(bodies) == 1
+    assert zone_text("example.com.").encode() in bodies.pop()
+    assert len({attempt for attempt in create}) == 1
+    assert len({attempt for attempt in listing}) == 1 and 'limit=5' in listing[0][2]
+    assert server.uploads and server.rrsets["example.com."][('www.example.com.', 'A')]['rdata'] == ["192.0.2.1"]
+
+
+def test_concurrent_identical_gets_share_one_request(server):
+    server.latency = 0.2
+    with client_for(server, coalesce_requests=True) as client:
+        barrier = threading.Barrier(16)
+
+        def call(_):
+            barrier.wait()
+            return client.version()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(call, range(16)))
+        stats = client.rest_api_connection.single_flight.stats()
+
+    assert results == [{'version': 'stand-in'}] * 16
+    assert len({id(result) for result in results}) == 16
+    assert server.requests.count(('GET', '/v1/version')) == 1
+    assert stats == {'in_flight': 0, 'executed': 1, 'coalesced': 15}
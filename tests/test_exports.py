@@ -0,0 +1,48 @@
+import pytest
+
+from ultra_rest_client import PollingStrategy, RestApiClient
+from ultra_rest_client.connection import RestError
+from stand_in import zone_text
+
+
+def client_for(server):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):],
+                         polling=PollingStrategy.fixed(0.01))
+
+
+def test_export_zones_creates_output_dir(server, tmp_path):
+    zones = [f"zone{i}.com." for i in range(5)]
+    output_dir = tmp_path / "exports" / "nested"
+    with client_for(server) as client:
+        exported = dict(client.export_zones(zones, chunk_size=2, max_workers=2, output_dir=str(output_dir)))
+
+    assert sorted(exported) == zones
+    for zone, path in exported.items():
+        with open(path, encoding='utf-8') as fileobj:
+            assert fileobj.read() == zone_text(zone)
+    assert server.tasks == {}
+
+
+def test_stopping_early_clears_outstanding_tasks(server):
+    zones = [f"zone{i}.com." for i in range(6)]
+    with client_for(server) as client:
+        exports = client.export_zones(zones, chunk_size=1, max_workers=3)
+        next(exports)
+        exports.close()
+
+    assert server.tasks == {}
+    assert len([request for request in server.requests if request == ('POST', '/v3/zones/export')]) >= 3
+
+
+def test_export_polling_follows_the_clients_strategy(server):
+    server.task_polls = 1000
+    client = RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):],
+                           polling=PollingStrategy.fixed(0.01, deadline=0.2))
+    with client:
+        with pytest.raises(RestError) as raised:
+            list(client.export_zones(["zone0.com.", "zone1.com."], chunk_size=1))
+
+    failed = raised.value.message['failedExports']
+    assert [failure['response']['error'] for failure in failed] == ['Polling deadline reached'] * 2
+    assert 2 < server.requests.count(('GET', '/v1/tasks/task0')) < 40
+    assert server.tasks == {}
@@ -0,0 +1,38 @@
+import io
+
+from ultra_rest_client import RestApiClient
+
+
+def client_for(server):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):])
+
+
+def test_relative_and_absolute_owners_are_one_rrset(server):
+    source = io.StringIO(
+        "zone,owner,type,ttl,rdata\n"
+        "example.com,www,A,300,192.0.2.1\n"
+        "example.com.,WWW.Example.com.,A,300,192.0.2.2\n"
+        "example.com.,@,MX,300,10 mail.example.com.\n"
+    )
+    with client_for(server) as client:
+        report = client.import_rrsets(source, fmt='csv')
+
+    assert report == {'rows': 3, 'rrsets': 2, 'created': 3, 'failed': 0, 'errors': []}
+    assert server.rrsets["example.com."] == {
+        ('www.example.com.', 'A'): {'ttl': 300, 'rdata': ['192.0.2.1', '192.0.2.2']},
+        ('example.com.', 'MX'): {'ttl': 300, 'rdata': ['10 mail.example.com.']}
+    }
+
+
+def test_rows_that_fail_are_reported(server):
+    server.add_rrset("example.com.", "taken.example.com.", "A", 300, ["192.0.2.1"])
+    source = io.StringIO(
+        '{"owner": "taken", "type": "A", "ttl": 300, "rdata": "192.0.2.2"}\n'
+        '{"owner": "fresh", "type": "A", "ttl": "x", "rdata": "192.0.2.3"}\n'
+        'not json\n'
+    )
+    with client_for(server) as client:
+        report = client.import_rrsets(source, fmt='jsonl', zone_name='example.com.')
+
+    assert (report['rows'], report['created'], report['failed']) == (3, 0, 3)
+    assert [error['row'] for error in report['errors']] == [2, 3, 1]
@@ -0,0 +1,59 @@
+import pytest
+
+from ultra_rest_client import RestApiClient
+from ultra_rest_client.connection import RestError
+from ultra_rest_client.utils.pagination import iter_offset_pages
+
+
+def client_for(server):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):])
+
+
+def add_rrsets(server, count):
+    for i in range(count):
+        server.add_rrset("example.com.", f"host{i:04}.example.com.", "A", 300, ["192.0.2.1"])
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_server_capped_limit_still_returns_every_rrset(server, ordered):
+    server.max_limit = 100
+    add_rrsets(server, 250)
+    with client_for(server) as client:
+        rrsets = client.fetch_all_rrsets("example.com.", page_size=500, ordered=ordered)
+    assert sorted(rrset['ownerName'] for rrset in rrsets) == [f"host{i:04}.example.com." for i in range(250)]
+
+
+def test_missing_total_count_raises(server):
+    server.total_count = False
+    add_rrsets(server, 20)
+    with client_for(server) as client:
+        with pytest.raises(RestError, match="totalCount"):
+            client.fetch_all_rrsets("example.com.", page_size=10)
+
+
+def test_empty_zone_yields_nothing(server):
+    with client_for(server) as client:
+        assert client.fetch_all_rrsets("example.com.") == []
+
+
+def pages(total, short_offset=None):
+    def fetch_page(offset, limit):
+        count = min(limit, total - offset)
+        if offset == short_offset:
+            count -= 1
+        return {'items': list(range(offset, offset + count)), 'resultInfo': {'totalCount': total}}
+    return fetch_page
+
+
+def test_pages_are_requested_with_the_servers_stride():
+    assert list(iter_offset_pages(pages(95), 'items', page_size=10)) == list(range(95))
+
+
+def test_short_page_before_the_last_raises():
+    with pytest.raises(RestError, match="offset 40 returned 9 of 10"):
+        list(iter_offset_pages(pages(95, short_offset=40), 'items', page_size=10))
+
+
+def test_short_last_page_raises():
+    with pytest.raises(RestError, match="offset 90 returned 4 of 5"):
+        list(iter_offset_pages(pages(95, short_offset=90), 'items', page_size=10))
@@ -0,0 +1,56 @@
+import pytest
+
+from ultra_rest_client import ratelimit
+from ultra_rest_client.ratelimit import RateLimiter, TokenBucket
+
+
+class Clock:
+    """A stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_is_free_then_reservations_queue_at_the_rate(clock):
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_tokens_refill_with_time_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.reserve(2)
+    clock.now += 0.5
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.5])
+
+
+def test_default_burst(clock):
+    assert TokenBucket(rate=0.5).burst == 1
+    assert TokenBucket(rate=20).burst == 20
+
+
+def test_limiter_waits_for_the_slowest_bucket(clock):
+    limiter = RateLimiter(rate=100, per_method={"post": 1}, per_uri={"/v1/batch": (2, 1), "/v1/*": 1})
+    assert limiter.reserve("POST", "/v1/batch?x=1") == 0.0
+    assert limiter.reserve("POST", "/v1/batch") == pytest.approx(1.0)
+    # only the first matching URI pattern applies
+    assert limiter.reserve("GET", "/v1/batch") == pytest.approx(1.0)
+    assert limiter.reserve("GET", "/v1/zones") == 0.0
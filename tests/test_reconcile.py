@@ -0,0 +1,94 @@
+import pytest
+
+from ultra_rest_client.utils.reconcile import _normalise, plan_zone
+
+
+def rrset(owner, rrtype, rdata, ttl=300, **extra):
+    return dict({'ownerName': owner, 'rrtype': rrtype, 'ttl': ttl, 'rdata': rdata}, **extra)
+
+
+@pytest.mark.parametrize("given, expected", [
+    (rrset("www", "A", "192.0.2.1"), rrset("www.example.com.", "A", ["192.0.2.1"])),
+    (rrset("@", "a", ["192.0.2.1"]), rrset("example.com.", "A", ["192.0.2.1"])),
+    (rrset("", "A", ["192.0.2.1"]), rrset("example.com.", "A", ["192.0.2.1"])),
+    (rrset(" WWW.Example.COM. ", "A (1)", ["192.0.2.1"], ttl="60"), rrset("www.example.com.", "A", ["192.0.2.1"], ttl=60)),
+    (rrset("mx", "MX (15)", ["10   mail.example.com."]), rrset("mx.example.com.", "MX", ["10 mail.example.com."])),
+    (rrset("pool", "A", ["192.0.2.1"], profile={'order': 'ROUND_ROBIN'}),
+     rrset("pool.example.com.", "A", ["192.0.2.1"], profile={'order': 'ROUND_ROBIN'})),
+    (rrset("www", "A", ["192.0.2.1"], profile=None), rrset("www.example.com.", "A", ["192.0.2.1"])),
+])
+def test_normalise(given, expected):
+    assert _normalise("example.com.", given) == expected
+
+
+def test_plan_sorts_rrsets_into_each_change():
+    current = [
+        rrset("same.example.com.", "A (1)", ["192.0.2.1", "192.0.2.2"]),
+        rrset("rdata.example.com.", "A (1)", ["192.0.2.1"]),
+        rrset("ttl.example.com.", "A (1)", ["192.0.2.1"]),
+        rrset("gone.example.com.", "A (1)", ["192.0.2.1"]),
+    ]
+    desired = [
+        rrset("Same", "A", ["192.0.2.2", "192.0.2.1"]),
+        rrset("rdata", "A", ["192.0.2.9"]),
+        rrset("ttl", "A", ["192.0.2.1"], ttl=60),
+        rrset("new", "A", "192.0.2.1"),
+    ]
+    plan = plan_zone("example.com", current, desired)
+    assert plan.summary() == {'create': 1, 'patch': 1, 'update': 1, 'delete': 1, 'unchanged': 1}
+    assert len(plan) == 4
+    assert plan.operations() == [
+        {'method': 'DELETE', 'uri': '/v1/zones/example.com/rrsets/A/gone.example.com.'},
+        {'method': 'PATCH', 'uri': '/v1/zones/example.com/rrsets/A/rdata.example.com.', 'body': {'rdata': ['192.0.2.9']}},
+        {'method': 'PUT', 'uri': '/v1/zones/example.com/rrsets/A/ttl.example.com.', 'body': {'ttl': 60, 'rdata': ['192.0.2.1']}},
+        {'method': 'POST', 'uri': '/v1/zones/example.com/rrsets/A/new.example.com.', 'body': {'ttl': 300, 'rdata': ['192.0.2.1']}},
+    ]
+
+
+def test_pool_rdata_order_is_significant_and_sent_as_put():
+    profile = {'@context': 'http://schemas.ultradns.com/RDPool.jsonschema', 'order': 'FIXED'}
+    current = [rrset("pool.example.com.", "A (1)", ["192.0.2.1", "192.0.2.2"], profile=profile)]
+
+    unchanged = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.1", "192.0.2.2"], profile=dict(profile))])
+    reordered = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.2", "192.0.2.1"], profile=profile)])
+
+    assert unchanged.summary()['unchanged'] == 1
+    assert reordered.summary()['update'] == 1
+    assert reordered.operations()[0]['body'] == {'ttl': 300, 'rdata': ['192.0.2.2', '192.0.2.1'], 'profile': profile}
+
+
+def test_apex_soa_and_ns_are_left_alone_unless_managed():
+    current = [
+        rrset("example.com.", "SOA (6)", ["ns1.example.com. admin.example.com. 1 7200 3600 1209600 900"]),
+        rrset("example.com.", "NS (2)", ["ns1.example.com."]),
+        rrset("sub.example.com.", "NS (2)", ["ns1.other.org."]),
+    ]
+    assert plan_zone("example.com.", current, []).summary()['delete'] == 1
+    assert plan_zone("example.com.", current, [], manage_apex=True).summary()['delete'] == 3
+
+
+def test_a_type_change_at_one_owner_deletes_before_creating():
+    current = [rrset("www.example.com.", "A (1)", ["192.0.2.1"])]
+    desired = [rrset("www", "CNAME", ["example.com."])]
+    assert [operation['method'] for operation in plan_zone("example.com.", current, desired).operations()] == ['DELETE', 'POST']
+
+
+def test_a_desired_rrset_without_a_profile_keeps_a_live_pool():
+    profile = {'@context': 'http://schemas.ultradns.com/RDPool.jsonschema', 'order': 'FIXED'}
+    current = [rrset("pool.example.com.", "A (1)", ["192.0.2.1", "192.0.2.2"], profile=profile)]
+
+    same = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.2", "192.0.2.1"])])
+    ttl = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.2", "192.0.2.1"], ttl=60)])
+    rdata = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.1", "192.0.2.3"])])
+    replaced = plan_zone("example.com.", current, [rrset("pool", "A", ["192.0.2.1", "192.0.2.2"])], keep_pools=False)
+
+    assert same.summary()['unchanged'] == 1
+    assert ttl.operations() == [{
+        'method': 'PUT', 'uri': '/v1/zones/example.com./rrsets/A/pool.example.com.',
+        'body': {'ttl': 60, 'rdata': ['192.0.2.1', '192.0.2.2'], 'profile': profile}
+    }]
+    assert rdata.operations() == [{
+        'method': 'PATCH', 'uri': '/v1/zones/example.com./rrsets/A/pool.example.com.',
+        'body': {'rdata': ['192.0.2.1', '192.0.2.3']}
+    }]
+    assert replaced.operations()[0]['body'] == {'ttl': 300, 'rdata': ['192.0.2.1', '192.0.2.2']}
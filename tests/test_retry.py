@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from ultra_rest_client import retry
+from ultra_rest_client.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    """Make backoff() return the top of its window."""
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+
+
+@pytest.mark.parametrize("attempt, delay", [(1, 0.5), (2, 1.0), (3, 2.0), (4, 4.0)])
+def test_backoff_doubles_per_attempt(no_jitter, attempt, delay):
+    policy = RetryPolicy(max_attempts=10)
+    assert policy.get_delay(attempt, time.monotonic()) == delay
+
+
+def test_backoff_is_capped(no_jitter):
+    policy = RetryPolicy(max_attempts=20, backoff_max=3)
+    assert policy.get_delay(10, time.monotonic()) == 3
+
+
+def test_backoff_is_jittered_within_its_window():
+    policy = RetryPolicy(max_attempts=10, backoff_base=1)
+    delays = [policy.get_delay(3, time.monotonic()) for _ in range(200)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_gives_up_after_max_attempts(no_jitter):
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.get_delay(2, time.monotonic()) == 1.0
+    assert policy.get_delay(3, time.monotonic()) is None
+
+
+def test_retry_after_raises_the_delay_but_never_lowers_it(no_jitter):
+    policy = RetryPolicy()
+    assert policy.get_delay(1, time.monotonic(), retry_after="7") == 7
+    assert policy.get_delay(3, time.monotonic(), retry_after="0") == 2.0
+
+
+def test_deadline_stops_retries_that_would_overrun_it(no_jitter):
+    policy = RetryPolicy(max_attempts=10, deadline=5)
+    started = time.monotonic()
+    assert policy.get_delay(1, started) == 0.5
+    assert policy.get_delay(1, started, retry_after="6") is None
+    assert policy.get_delay(1, started - 4.8) is None
+
+
+def test_connection_errors_can_be_excluded(no_jitter):
+    error = ConnectionError()
+    assert RetryPolicy().get_delay(1, time.monotonic(), error=error) == 0.5
+    assert RetryPolicy(retry_connection_errors=False).get_delay(1, time.monotonic(), error=error) is None
+
+
+@pytest.mark.parametrize("value, seconds", [
+    (None, None),
+    ("", None),
+    ("12", 12.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ("soon", None),
+])
+def test_parse_retry_after(value, seconds):
+    assert parse_retry_after(value) == seconds
+
+
+def test_parse_retry_after_http_date_in_the_future():
+    value = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))
+    assert 55 < parse_retry_after(value) <= 60
@@ -0,0 +1,50 @@
+import json
+
+from ultra_rest_client import RestApiClient, TaskTracker
+from stand_in import zone_text
+
+
+def client_for(server):
+    return RestApiClient("user", "password", use_http=True, host=server.url[len("http://"):])
+
+
+def export(client, zone):
+    return client.rest_api_connection.post("/v3/zones/export", json=json.dumps({'zoneNames': [zone]}))
+
+
+def test_tracked_tasks_are_polled_together(server):
+    server.task_polls = 3
+    with client_for(server) as client, TaskTracker(client, poll_interval=0.01) as tracker:
+        futures = {zone: tracker.track(export(client, zone)) for zone in ("a.com.", "b.com.", "c.com.")}
+        tracker.wait(timeout=10)
+        assert {zone: future.result() for zone, future in futures.items()} == {zone: zone_text(zone) for zone in futures}
+        assert tracker.bulk_polls >= 1
+    assert server.requests.count(('GET', '/v1/tasks')) == tracker.bulk_polls
+
+
+def test_an_error_response_fails_only_its_own_task(server):
+    server.task_polls = 3
+    with client_for(server) as client, TaskTracker(client, poll_interval=0.01) as tracker:
+        healthy = tracker.track(export(client, "example.com."))
+        unknown = tracker.track("no-such-task")
+        tracker.wait(timeout=10)
+        assert unknown.result() == [{'errorCode': 70002, 'errorMessage': 'Task not found'}]
+        assert healthy.result() == zone_text("example.com.")
+
+
+def test_a_failed_listing_falls_back_to_single_task_polls(server, monkeypatch):
+    def get_all_tasks():
+        raise ConnectionError("connection reset")
+
+    server.task_polls = 3
+    with client_for(server) as client, TaskTracker(client, poll_interval=0.01) as tracker:
+        monkeypatch.setattr(client, "get_all_tasks", get_all_tasks)
+        futures = [tracker.track(export(client, zone)) for zone in ("a.com.", "b.com.")]
+        tracker.wait(timeout=10)
+        assert [future.result() for future in futures] == [zone_text("a.com."), zone_text("b.com.")]
+        assert tracker.task_polls >= 4
+
+
+def test_responses_without_a_task_id_pass_through(server):
+    with client_for(server) as client, TaskTracker(client) as tracker:
+        assert tracker.track({'message': 'Successful'}).result(timeout=1) == {'message': 'Successful'}
@@ -0,0 +1,123 @@
+import pytest
+
+from ultra_rest_client.utils.zonefile import ResourceRecord, ZoneFileError, _tokenize, group_rrsets, parse_zone_text
+
+
+def records(text, origin="example.com.", default_ttl=300):
+    return list(parse_zone_text(text, origin, default_ttl))
+
+
+@pytest.mark.parametrize("line, tokens, depth", [
+    ("www 300 IN A 192.0.2.1", ["www", "300", "IN", "A", "192.0.2.1"], 0),
+    ("www A 192.0.2.1 ; a comment", ["www", "A", "192.0.2.1"], 0),
+    ("@ SOA ns1 admin (", ["@", "SOA", "ns1", "admin"], 1),
+    ("  3600 )", ["3600"], -1),
+    ('txt TXT "a b" "c;d"', ["txt", "TXT", '"a b"', '"c;d"'], 0),
+    ('txt TXT "say \\"hi\\"" ; comment', ["txt", "TXT", '"say \\"hi\\""'], 0),
+    ('txt TXT ("a" "b")', ["txt", "TXT", '"a"', '"b"'], 0),
+])
+def test_tokenize(line, tokens, depth):
+    found = []
+    assert _tokenize(line, found, 1) == depth
+    assert found == tokens
+
+
+def test_tokenize_rejects_an_unterminated_string():
+    with pytest.raises(ZoneFileError, match="line 7: unterminated quoted string"):
+        _tokenize('txt TXT "open', [], 7)
+
+
+@pytest.mark.parametrize("line, rdata", [
+    ('txt TXT "hello world"', "hello world"),
+    ('txt TXT "hello;" " world"', "hello; world"),
+    ('txt TXT unquoted', "unquoted"),
+    ('txt TXT "say \\"hi\\""', 'say "hi"'),
+    ('txt TXT "back\\\\slash"', "back\\slash"),
+    ('txt TXT "\\065\\066C"', "ABC"),
+    ('txt SPF "v=spf1 -all"', "v=spf1 -all"),
+])
+def test_txt_rdata_is_unquoted_unescaped_and_joined(line, rdata):
+    [record] = records(line)
+    assert record.rdata == rdata
+
+
+@pytest.mark.parametrize("line, rdata", [
+    ("Www CNAME Target", "target.example.com."),
+    ("www CNAME Other.ORG.", "other.org."),
+    ("@ MX 10 Mail", "10 mail.example.com."),
+    ("_sip._tcp SRV 10 5 5060 SIP", "10 5 5060 sip.example.com."),
+    ("@ NS @", "example.com."),
+    ("host A 192.0.2.1", "192.0.2.1"),
+])
+def test_names_in_rdata_are_absolute_and_lower_case(line, rdata):
+    [record] = records(line)
+    assert record.rdata == rdata
+
+
+def test_owner_names_and_types():
+    text = (
+        "$ORIGIN Example.COM.\n"
+        "WWW in a 192.0.2.1\n"
+        "    AAAA 2001:db8::1\n"
+        "@ A 192.0.2.2\n"
+        "Abs.Example.Org. A 192.0.2.3\n"
+    )
+    assert records(text, origin=None) == [
+        ResourceRecord("www.example.com.", 300, "IN", "A", "192.0.2.1"),
+        ResourceRecord("www.example.com.", 300, "IN", "AAAA", "2001:db8::1"),
+        ResourceRecord("example.com.", 300, "IN", "A", "192.0.2.2"),
+        ResourceRecord("abs.example.org.", 300, "IN", "A", "192.0.2.3"),
+    ]
+
+
+def test_ttls():
+    text = (
+        "a 60 A 192.0.2.1\n"
+        "$TTL 1h30m\n"
+        "b A 192.0.2.2\n"
+        "c 1w IN A 192.0.2.3\n"
+        "d IN 2d A 192.0.2.4\n"
+    )
+    assert [record.ttl for record in records(text, default_ttl=None)] == [60, 5400, 604800, 172800]
+
+
+def test_multi_line_soa_takes_its_minimum_as_ttl():
+    text = (
+        "@ IN SOA NS1 Admin (\n"
+        "    2024010101 ; serial\n"
+        "    7200 3600 1209600\n"
+        "    900 )\n"
+        "www A 192.0.2.1\n"
+    )
+    soa, a = records(text, default_ttl=None)
+    assert soa == ResourceRecord("example.com.", 900, "IN", "SOA",
+                                 "ns1.example.com. admin.example.com. 2024010101 7200 3600 1209600 900")
+    assert a.ttl == 900
+
+
+@pytest.mark.parametrize("text, message", [
+    ("www A 192.0.2.1\n", "line 1: no TTL given"),
+    ("$INCLUDE other.zone\n", "line 1: unsupported directive"),
+    ("$TTL\n", "line 1: \\$TTL needs a value"),
+    ("$TTL soon\n", "line 1: invalid TTL"),
+    ("www 300\n", "line 1: missing record type"),
+    ("  300 A 192.0.2.1\n", "line 1: record without an owner name"),
+    ("www 300 A 192.0.2.1 )\n", "line 1: unbalanced '\\)'"),
+    ("@ 300 SOA ns1 admin (\n 1 2 3 4 5\n", "line 1: unbalanced '\\('"),
+])
+def test_malformed_files_raise(text, message):
+    with pytest.raises(ZoneFileError, match=message):
+        records(text, default_ttl=None)
+
+
+def test_relative_names_need_an_origin():
+    with pytest.raises(ZoneFileError, match="relative name 'www' used without an origin"):
+        records("www 300 A 192.0.2.1\n", origin=None)
+
+
+def test_group_rrsets_merges_records_and_keeps_the_first_ttl():
+    text = "www 60 A 192.0.2.1\nWWW 120 A 192.0.2.2\nwww A 192.0.2.1\nwww AAAA 2001:db8::1\n"
+    assert group_rrsets(records(text, default_ttl=None)) == [
+        {'ownerName': 'www.example.com.', 'rrtype': 'A', 'ttl': 60, 'rdata': ['192.0.2.1', '192.0.2.2']},
+        {'ownerName': 'www.example.com.', 'rrtype': 'AAAA', 'ttl': 120, 'rdata': ['2001:db8::1']},
+    ]